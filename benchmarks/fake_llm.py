@@ -0,0 +1,89 @@
+"""
+Scripted Stand-In for the Anthropic Client
+============================================
+FakeAnthropic replaces anthropic.Anthropic in the agent loop and replays a
+fixed script instead of calling the API:
+
+    script = [
+        [("get_market_prices", {"symbols": ["BTC-PERP", "ETH-PERP"]}), ("check_balance", {...})],
+        [("play_dice", {"bet_amount": 0.1, "target": 50, "over": True})],
+    ]
+    full_agent.anthropic_client = FakeAnthropic(script, latency_s=0.3)
+
+Each script entry is one assistant turn of tool_use blocks; after the last one
+the model answers with text and stop_reason "end_turn". The turn is worked out
+from the tool_use ids in the request, so one FakeAnthropic can serve many
+concurrent agent runs. Usage numbers imitate a warm prompt cache.
+"""
+
+import re
+import time
+from dataclasses import dataclass, field
+
+_TOOL_ID = re.compile(r"toolu_fake_(\d+)_\d+")
+
+
+@dataclass
+class TextBlock:
+    text: str
+    type: str = "text"
+
+
+@dataclass
+class ToolUseBlock:
+    id: str
+    name: str
+    input: dict
+    type: str = "tool_use"
+
+
+@dataclass
+class Usage:
+    input_tokens: int = 0
+    output_tokens: int = 0
+    cache_read_input_tokens: int = 0
+    cache_creation_input_tokens: int = 0
+
+
+@dataclass
+class Message:
+    content: list
+    stop_reason: str
+    usage: Usage = field(default_factory=Usage)
+    role: str = "assistant"
+
+
+def _last_turn(messages: list) -> int:
+    """Newest script turn answered by tool results in messages, or -1 before the first tool call."""
+    turns = [-1]
+    for message in messages:
+        if isinstance(message["content"], str):
+            continue
+        turns.extend(int(m[1]) for block in message["content"] if isinstance(block, dict)
+                     if (m := _TOOL_ID.fullmatch(str(block.get("tool_use_id", "")))))
+    return max(turns)
+
+
+class FakeAnthropic:
+    """Drop-in for anthropic.Anthropic().messages.create that replays a script."""
+
+    def __init__(self, script: list, latency_s: float = 0.0, final_text: str = "All done."):
+        self.script = script
+        self.latency_s = latency_s
+        self.final_text = final_text
+        self.calls = 0
+        self.messages = self
+
+    def create(self, **request) -> Message:
+        self.calls += 1
+        if self.latency_s:
+            time.sleep(self.latency_s)
+        turn = _last_turn(request["messages"]) + 1
+        prompt_chars = sum(len(str(m["content"])) for m in request["messages"])
+        usage = Usage(input_tokens=prompt_chars // 4, output_tokens=50,
+                      cache_read_input_tokens=2000 if turn else 0, cache_creation_input_tokens=0 if turn else 2000)
+        if turn >= len(self.script):
+            return Message([TextBlock(self.final_text)], "end_turn", usage)
+        blocks = [ToolUseBlock(f"toolu_fake_{turn}_{i}", name, dict(tool_input))
+                  for i, (name, tool_input) in enumerate(self.script[turn])]
+        return Message([TextBlock(f"Step {turn + 1}."), *blocks], "tool_use", usage)
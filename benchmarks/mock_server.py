@@ -0,0 +1,337 @@
+"""
+Local Purple Flea Stand-In Server
+===================================
+A stdlib HTTP server that answers the wallet, trading, casino and domains
+endpoints used by examples/*.py with deterministic fake data, so the examples
+can be benchmarked without a network.
+
+    python benchmarks/mock_server.py --port 8787 --latency-ms 20 --error-rate 0.01
+
+Each product is served under /<product>/api/v1, so pointing
+PURPLEFLEA_<PRODUCT>_API at http://127.0.0.1:<port>/<product>/api/v1 routes the
+real SDK, the shared session and transport.RateLimitedAdapter through it.
+
+Every response waits latency_ms ± jitter_ms. A share of requests (error_rate)
+fails with 503 and a share (throttle_rate) with a 429 + Retry-After, so retry
+paths get exercised too. Requests that match no route get a 404 and are
+counted under "unmatched" in stats(), which shows if the SDK's paths drift
+from ROUTES.
+"""
+
+import argparse
+import hashlib
+import itertools
+import json
+import random
+import re
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, unquote, urlsplit
+
+PRODUCTS = ("wallet", "trading", "casino", "domains")
+CHAINS = ("ethereum", "base", "solana", "bitcoin")
+TLDS = (".com", ".io", ".ai", ".xyz", ".org", ".net")
+MAX_ORDER_USD = 1_000  # larger orders are rejected, like the real API's risk checks
+
+
+class FakeData:
+    """Deterministic fake state shared by all handlers."""
+
+    def __init__(self, seed: int = 0, markets: int = 200, owned_domains: int = 1000, history: int = 5000):
+        rng = random.Random(seed)
+        self.ids = itertools.count(1)
+        self.markets = {
+            f"M{i}-PERP": {
+                "symbol": f"M{i}-PERP",
+                "price": round(rng.uniform(0.01, 70_000), 2),
+                "change_24h": round(rng.gauss(0, 5), 2),
+                "volume_24h": round(rng.lognormvariate(15, 2), 2),
+                "funding_rate": round(rng.gauss(0, 0.01), 4),
+            }
+            for i in range(markets)
+        }
+        for i, symbol in enumerate(("BTC-PERP", "ETH-PERP", "SOL-PERP")):
+            self.markets[symbol] = {"symbol": symbol, "price": (65_000, 3_200, 150)[i], "change_24h": 1.5,
+                                    "volume_24h": 2e9, "funding_rate": 0.01}
+        self.owned = [{"domain": f"owned-{i}.com", "days_until_expiry": rng.randrange(0, 400),
+                       "auto_renew": True} for i in range(owned_domains)]
+        self.history = []
+        for i in range(history, 0, -1):  # newest first
+            bet = round(rng.uniform(0.1, 5), 2)
+            won = rng.random() < 0.49
+            self.history.append({"id": f"g{i}", "game": "dice", "bet_amount": bet,
+                                 "payout": round(bet * 1.98, 2) if won else 0.0, "won": won})
+
+    def next_id(self, prefix: str) -> str:
+        return f"{prefix}_{next(self.ids)}"
+
+
+def _taken(domain: str) -> bool:
+    return hashlib.sha1(domain.encode()).digest()[0] < 170  # about two thirds are taken
+
+
+def _page(items: list, key: str, query: dict) -> list:
+    limit = int(query.get("limit", 100))
+    cursor = query.get("cursor")
+    start = 0
+    if cursor:
+        start = next((i + 1 for i, item in enumerate(items) if item[key] == cursor), len(items))
+    return items[start:start + limit]
+
+
+# --- Handlers: (data, match, query, body) -> JSON-able ------------------------
+
+def create_wallet(data, match, query, body):
+    wallet_id = data.next_id("w")
+    return {"id": wallet_id, "name": body.get("name"),
+            "addresses": {chain: f"{chain[:3]}-{wallet_id}" for chain in body.get("chains", CHAINS)}}
+
+
+def wallet_balances(data, match, query, body):
+    rng = random.Random(match[1])
+    return {chain: [{"symbol": symbol, "balance": f"{rng.uniform(0, 1000):.6f}",
+                     "usd_value": round(rng.uniform(0, 1000), 2)} for symbol in ("USDC", "ETH")]
+            for chain in CHAINS}
+
+
+def wallet_send(data, match, query, body):
+    tx_hash = "0x" + hashlib.sha256(json.dumps(body, sort_keys=True).encode()).hexdigest()
+    return {"hash": tx_hash, "status": "pending", "explorer_url": f"https://explorer.invalid/tx/{tx_hash}"}
+
+
+def wallet_transactions(data, match, query, body):
+    return [{"timestamp": "2026-01-01T00:00:00Z", "type": "send", "amount": "1.00", "token": "USDC",
+             "status": "confirmed"} for _ in range(int(query.get("limit", 10)))]
+
+
+def wallet_transaction(data, match, query, body):
+    return {"hash": match[2], "status": "confirmed"}
+
+
+def list_markets(data, match, query, body):
+    min_volume = float(query.get("min_volume", 0))
+    return [m for m in data.markets.values() if m["volume_24h"] >= min_volume]
+
+
+def get_market(data, match, query, body):
+    return data.markets.get(unquote(match[1])) or ("not found", 404)
+
+
+def create_order(data, match, query, body):
+    market = data.markets.get(body.get("symbol"))
+    if market is None:
+        return "unknown symbol", 400
+    if (body.get("size_usd") or 0) > MAX_ORDER_USD:
+        return f"order size exceeds ${MAX_ORDER_USD}", 400
+    return {"id": data.next_id("ord"), "symbol": body["symbol"], "side": body.get("side"),
+            "type": body.get("type"), "size_usd": body.get("size_usd"), "fill_price": market["price"],
+            "status": "filled"}
+
+
+def get_portfolio(data, match, query, body):
+    return {"total_value": 10_000.0, "unrealized_pnl": 125.5, "daily_pnl": -12.25,
+            "positions": [{"id": "pos_1", "symbol": "BTC-PERP", "side": "long", "size_usd": 500.0,
+                           "leverage": 2, "unrealized_pnl": 20.0}]}
+
+
+def close_position(data, match, query, body):
+    return {"id": match[1], "realized_pnl": 12.5}
+
+
+def list_games(data, match, query, body):
+    return [{"name": name, "description": f"{name} game", "min_bet": 0.01, "max_bet": 100, "house_edge": 1.0}
+            for name in ("dice", "coinflip", "crash")]
+
+
+def play_game(data, match, query, body):
+    roll = random.randint(1, 100)
+    options = body.get("options", {})
+    target = options.get("target", 50)
+    won = roll > target if options.get("over", True) else roll < target
+    bet = body.get("bet_amount", 1.0)
+    outcome = random.choice(("heads", "tails"))
+    if body.get("game") == "coinflip":
+        won = outcome == options.get("choice")
+    return {"id": data.next_id("g"), "game": body.get("game"), "roll": roll, "outcome": outcome, "won": won,
+            "payout": round(bet * 1.98, 2) if won else 0.0, "profit": round(bet * 0.98, 2) if won else 0.0,
+            "server_seed_hash": hashlib.sha256(str(roll).encode()).hexdigest()}
+
+
+def game_history(data, match, query, body):
+    return _page(data.history, "id", query)
+
+
+def search_domains(data, match, query, body):
+    tlds = query.get("tlds", ",".join(TLDS)).split(",")
+    return [{"domain": query["name"] + tld, "available": not _taken(query["name"] + tld), "price": 12.99}
+            for tld in tlds]
+
+
+def search_many(data, match, query, body):
+    return [{"domain": domain, "available": not _taken(domain), "price": 12.99} for domain in body["domains"]]
+
+
+def register_domain(data, match, query, body):
+    return {"domain": body["domain"], "expires_at": "2027-01-01", "auto_renew": body.get("auto_renew", True),
+            "nameservers": ["ns1.purpleflea.invalid", "ns2.purpleflea.invalid"]}
+
+
+def list_owned(data, match, query, body):
+    return _page(data.owned, "domain", query)
+
+
+def renew_domain(data, match, query, body):
+    return {"domain": match[1], "expires_at": "2027-01-01"}
+
+
+def get_dns(data, match, query, body):
+    return [{"type": "A", "name": "@", "value": "1.2.3.4", "ttl": 300}]
+
+
+def set_dns(data, match, query, body):
+    return {"domain": match[1], "records": body.get("records", [])}
+
+
+ROUTES = [
+    ("POST", "wallet", r"/wallets", create_wallet),
+    ("GET", "wallet", r"/wallets/([^/]+)/balances", wallet_balances),
+    ("POST", "wallet", r"/wallets/([^/]+)/send", wallet_send),
+    ("GET", "wallet", r"/wallets/([^/]+)/transactions", wallet_transactions),
+    ("GET", "wallet", r"/wallets/([^/]+)/transactions/([^/]+)", wallet_transaction),
+    ("GET", "trading", r"/markets", list_markets),
+    ("GET", "trading", r"/markets/([^/]+)", get_market),
+    ("POST", "trading", r"/orders", create_order),
+    ("GET", "trading", r"/portfolio", get_portfolio),
+    ("POST", "trading", r"/positions/([^/]+)/close", close_position),
+    ("GET", "casino", r"/games", list_games),
+    ("POST", "casino", r"/games/play", play_game),
+    ("GET", "casino", r"/games/history", game_history),
+    ("GET", "domains", r"/domains/search", search_domains),
+    ("POST", "domains", r"/domains/search", search_many),
+    ("POST", "domains", r"/domains", register_domain),
+    ("GET", "domains", r"/domains", list_owned),
+    ("POST", "domains", r"/domains/([^/]+)/renew", renew_domain),
+    ("GET", "domains", r"/domains/([^/]+)/dns", get_dns),
+    ("PUT", "domains", r"/domains/([^/]+)/dns", set_dns),
+]
+_COMPILED = [(method, product, re.compile(pattern + "/?"), handler) for method, product, pattern, handler in ROUTES]
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, like the real API
+
+    def log_message(self, format, *args):
+        pass
+
+    def _respond(self, status: int, payload, headers: dict = None) -> None:
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _handle(self) -> None:
+        mock = self.server.mock
+        parts = urlsplit(self.path)
+        length = int(self.headers.get("Content-Length") or 0)
+        body = json.loads(self.rfile.read(length) or b"{}") if length else {}
+        query = {k: v[-1] for k, v in parse_qs(parts.query).items()}
+
+        product, _, rest = parts.path.lstrip("/").partition("/api/v1")
+        route = next(((handler, match) for method, p, pattern, handler in _COMPILED
+                      if method == self.command and p == product and (match := pattern.fullmatch(rest))), None)
+        mock.wait()
+        if route is None:
+            mock.count("unmatched", f"{self.command} {parts.path}")
+            return self._respond(404, {"error": "no such route"})
+
+        handler, match = route
+        mock.count("requests", handler.__name__)
+        roll = random.random()
+        if roll < mock.throttle_rate:
+            mock.count("injected", "429")
+            return self._respond(429, {"error": "rate limited"}, {"Retry-After": "0"})
+        if roll < mock.throttle_rate + mock.error_rate:
+            mock.count("injected", "503")
+            return self._respond(503, {"error": "injected failure"})
+
+        result = handler(mock.data, match, query, body)
+        if isinstance(result, tuple):
+            return self._respond(result[1], {"error": result[0]})
+        self._respond(200, result)
+
+    do_GET = do_POST = do_PUT = do_DELETE = _handle
+
+
+class MockPurpleFlea:
+    """The stand-in server, run on a background thread."""
+
+    def __init__(self, port: int = 0, latency_ms: float = 0.0, jitter_ms: float = 0.0,
+                 error_rate: float = 0.0, throttle_rate: float = 0.0, seed: int = 0):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.data = FakeData(seed)
+        self._counters = {"requests": Counter(), "injected": Counter(), "unmatched": Counter()}
+        self._lock = threading.Lock()
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", port), _Handler)
+        self.httpd.daemon_threads = True
+        self.httpd.mock = self
+        self._thread = None
+
+    @property
+    def port(self) -> int:
+        return self.httpd.server_address[1]
+
+    def base_url(self, product: str) -> str:
+        return f"http://127.0.0.1:{self.port}/{product}/api/v1"
+
+    def env(self) -> dict:
+        """Environment variables that point the examples at this server."""
+        return {f"PURPLEFLEA_{product.upper()}_API": self.base_url(product) for product in PRODUCTS}
+
+    def wait(self) -> None:
+        delay = self.latency_ms + random.uniform(-self.jitter_ms, self.jitter_ms)
+        if delay > 0:
+            time.sleep(delay / 1000)
+
+    def count(self, kind: str, name: str) -> None:
+        with self._lock:
+            self._counters[kind][name] += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {kind: dict(counter) for kind, counter in self._counters.items()}
+
+    def start(self) -> "MockPurpleFlea":
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name="mock-purpleflea", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run a local stand-in for the Purple Flea APIs")
+    parser.add_argument("--port", type=int, default=8787)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of requests answered with 503")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="Share of requests answered with 429")
+    args = parser.parse_args()
+
+    mock = MockPurpleFlea(args.port, args.latency_ms, args.jitter_ms, args.error_rate, args.throttle_rate)
+    for name, value in mock.env().items():
+        print(f"export {name}={value}")
+    try:
+        mock.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
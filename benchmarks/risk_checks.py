@@ -0,0 +1,113 @@
+"""
+Purple Flea Pre-Trade Risk Benchmark
+======================================
+What it costs to turn down a bad order locally (examples/risk.py) compared
+with sending it and letting the Trading API reject it:
+
+    python benchmarks/risk_checks.py --iterations 2000 --latency-ms 20
+
+  local.check.accept    RiskEngine.check on an order within limits
+  local.check.reject    RiskEngine.check on an oversized order
+  local.place_order     trading_agent.place_market_order refused by the engine
+  remote.place_order    the same order sent to the stand-in server, which rejects it
+
+The local rows need only the standard library. The order rows use the real
+SDK against mock_server.py, so they need purpleflea and requests. They are
+skipped if either is missing. On top of the remote row, a live agent also
+spends an LLM turn reading the rejection.
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import statistics
+import sys
+import tempfile
+import time
+from types import SimpleNamespace
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, "..", "examples"))
+
+from mock_server import MAX_ORDER_USD, MockPurpleFlea  # noqa: E402
+from risk import RiskEngine, RiskLimits  # noqa: E402
+
+PORTFOLIO = SimpleNamespace(total_value=10_000.0, positions=[
+    {"symbol": f"M{i}-PERP", "side": "long" if i % 2 else "short", "size_usd": 100.0} for i in range(50)
+])
+
+
+def time_calls(fn, iterations: int) -> list:
+    """Per-call latencies in microseconds; an exception (the rejection being measured) ends a call like a return."""
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        try:
+            fn()
+        except Exception:
+            pass
+        samples.append((time.perf_counter() - start) * 1e6)
+    return samples
+
+
+def local_benchmarks() -> dict:
+    engine = RiskEngine(client=None, limits=RiskLimits(max_order_usd=MAX_ORDER_USD))
+    engine.load(PORTFOLIO)
+    return {
+        "local.check.accept": lambda: engine.check("BTC-PERP", "buy", 100.0),
+        "local.check.reject": lambda: engine.check("BTC-PERP", "buy", MAX_ORDER_USD * 5),
+    }
+
+
+def order_benchmarks(mock: MockPurpleFlea, workdir: str) -> dict:
+    """Local vs remote rejection through the real SDK; empty if it isn't installed."""
+    from run_benchmarks import _configure_environment
+
+    _configure_environment(mock, workdir)
+    try:
+        import trading_agent
+    except ImportError as e:
+        print(f"  order benchmarks skipped: {e}", file=sys.stderr)
+        return {}
+    oversized = MAX_ORDER_USD * 5
+    trading_agent.risk.limits.max_order_usd = MAX_ORDER_USD
+    return {
+        "local.place_order": lambda: trading_agent.place_market_order("BTC-PERP", "buy", oversized),
+        "remote.place_order": lambda: trading_agent.client.orders.create(
+            symbol="BTC-PERP", side="buy", type="market", size_usd=oversized, leverage=1),
+    }
+
+
+def summarize(samples: list) -> dict:
+    ordered = sorted(samples)
+    return {
+        "n": len(ordered),
+        "p50_us": statistics.median(ordered),
+        "p99_us": ordered[min(int(len(ordered) * 0.99), len(ordered) - 1)],
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare local pre-trade rejection with remote rejection")
+    parser.add_argument("--iterations", type=int, default=1000)
+    parser.add_argument("--latency-ms", type=float, default=5.0, help="Stand-in server latency per request")
+    args = parser.parse_args()
+
+    mock = MockPurpleFlea(latency_ms=args.latency_ms).start()
+    with tempfile.TemporaryDirectory() as workdir:
+        benchmarks = {**local_benchmarks(), **order_benchmarks(mock, workdir)}
+        results = {}
+        for name, fn in benchmarks.items():
+            iterations = args.iterations if name.startswith("local") else max(args.iterations // 10, 10)
+            with contextlib.redirect_stdout(io.StringIO()):  # trading_agent prints every rejection
+                time_calls(fn, min(iterations, 10))  # warm up: imports, connections, first portfolio sync
+                results[name] = summarize(time_calls(fn, iterations))
+    mock.stop()
+
+    print(f"\n{'benchmark':<22} {'n':>6} {'p50 µs':>12} {'p99 µs':>12}")
+    for name, r in results.items():
+        print(f"{name:<22} {r['n']:>6} {r['p50_us']:>12.1f} {r['p99_us']:>12.1f}")
+    if "remote.place_order" in results:
+        speedup = results["remote.place_order"]["p50_us"] / results["local.place_order"]["p50_us"]
+        print(f"\nLocal rejection is {speedup:,.0f}x faster at p50 than a round-trip to the API.")
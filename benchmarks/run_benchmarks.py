@@ -0,0 +1,184 @@
+"""
+Purple Flea Offline Benchmarks
+================================
+Measures the examples end to end against the local stand-in server
+(mock_server.py) and the scripted model (fake_llm.py), with no network:
+
+    python benchmarks/run_benchmarks.py --iterations 200 --latency-ms 20 --error-rate 0.01
+    python benchmarks/run_benchmarks.py --json results.json
+    python benchmarks/run_benchmarks.py --baseline results.json   # exit 1 on a p50 regression
+
+Each benchmark runs `iterations` times with `concurrency` calls in flight,
+and the report gives p50/p99 latency and throughput per benchmark, plus the
+server's request counts and the transport's retry counters. Caches (market
+data, taken domains) stay warm between iterations, as in a long-running agent.
+
+Real SDK clients are used, so purpleflea, anthropic, requests, numpy and
+python-dotenv must be installed; no API keys are needed.
+"""
+
+import argparse
+import contextlib
+import io
+import itertools
+import json
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, "..", "examples"))
+
+from fake_llm import FakeAnthropic  # noqa: E402
+from mock_server import MockPurpleFlea  # noqa: E402
+
+AGENT_SCRIPT = [
+    [("create_wallet", {"name": "bench-agent"}),
+     ("get_market_prices", {"symbols": ["BTC-PERP", "ETH-PERP", "SOL-PERP"]})],
+    [("get_wallet_balance", {"wallet_id": "w_1"}),
+     ("search_domains", {"names": ["ai-agent", "agent-forge", "agent-pilot"], "limit": 5})],
+    [("play_dice", {"bet_amount": 0.1, "target": 50, "over": True})],
+]
+
+
+def _configure_environment(mock: MockPurpleFlea, workdir: str) -> None:
+    """Point the examples at the stand-in server before any of them is imported."""
+    os.environ.update(mock.env())
+    os.environ.setdefault("PURPLEFLEA_API_KEY", "bench")
+    os.environ.setdefault("ANTHROPIC_API_KEY", "bench")
+    os.environ["PURPLEFLEA_LEDGER_PATH"] = os.path.join(workdir, "ledger.db")
+    os.environ["PURPLEFLEA_HISTORY_CHECKPOINT"] = os.path.join(workdir, "history.json")
+
+
+def build_benchmarks(llm_latency_s: float) -> dict:
+    """{name: zero-argument callable}; imports the examples, so call after _configure_environment."""
+    import casino_agent
+    import domains_agent
+    import full_agent
+    import trading_agent
+
+    full_agent.anthropic_client = FakeAnthropic(AGENT_SCRIPT, latency_s=llm_latency_s)
+
+    sides = itertools.cycle(["buy", "sell"])
+
+    def summarize_cold():
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(casino_agent.HISTORY_CHECKPOINT)
+        casino_agent.summarize_game_history(page_size=500)
+
+    return {
+        "execute_tool.get_market_prices": lambda: full_agent.execute_tool(
+            "get_market_prices", {"symbols": ["BTC-PERP", "ETH-PERP"]}),
+        "execute_tool.get_wallet_balance": lambda: full_agent.execute_tool("get_wallet_balance", {"wallet_id": "w_1"}),
+        "execute_tool.place_trade": lambda: full_agent.execute_tool(  # alternating, so risk limits never bind
+            "place_trade", {"symbol": "BTC-PERP", "side": next(sides), "size_usd": 10}),
+        "execute_tool.search_domains": lambda: full_agent.execute_tool("search_domains", {"name": "ai-agent"}),
+        "execute_tool.play_dice": lambda: full_agent.execute_tool(
+            "play_dice", {"bet_amount": 0.1, "target": 50, "over": True}),
+        "run_money_stack_agent": lambda: full_agent.run_money_stack_agent("Benchmark task"),
+        "scan_opportunities": lambda: trading_agent.scan_opportunities(1_000_000),
+        "casino.play_dice": lambda: casino_agent.play_dice(0.1),
+        "casino.get_game_history": lambda: casino_agent.get_game_history(50),
+        "casino.summarize_game_history": summarize_cold,
+        "domains.search_domains_bulk": lambda: domains_agent.search_domains_bulk(
+            [f"bench-{i}" for i in range(50)], tlds=[".com", ".ai"], limit=20),
+        "domains.renew_expiring_domains": lambda: domains_agent.renew_expiring_domains(30),
+    }
+
+
+def run_benchmark(fn, iterations: int, concurrency: int) -> dict:
+    """Latency percentiles (ms) and throughput for iterations calls of fn."""
+    from fleet_runner import percentile
+
+    def timed(_):
+        start = time.perf_counter()
+        try:
+            fn()
+            error = None
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+        return time.perf_counter() - start, error
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        samples = list(pool.map(timed, range(iterations)))
+    wall = time.perf_counter() - start
+
+    latencies = [seconds * 1000 for seconds, _ in samples]
+    errors = [error for _, error in samples if error]
+    return {
+        "iterations": iterations,
+        "errors": len(errors),
+        "first_error": errors[0] if errors else None,
+        "p50_ms": percentile(latencies, 50),
+        "p99_ms": percentile(latencies, 99),
+        "throughput_per_s": iterations / wall if wall else 0.0,
+    }
+
+
+def print_report(results: dict, server_stats: dict, transport: dict) -> None:
+    print(f"\n{'benchmark':<34} {'n':>5} {'err':>4} {'p50 ms':>9} {'p99 ms':>9} {'ops/s':>9}")
+    for name, r in results.items():
+        print(f"{name:<34} {r['iterations']:>5} {r['errors']:>4} {r['p50_ms']:>9.2f} "
+              f"{r['p99_ms']:>9.2f} {r['throughput_per_s']:>9.1f}")
+        if r["first_error"]:
+            print(f"  ✗ {r['first_error'][:100]}")
+    print(f"\nServer: {sum(server_stats['requests'].values())} requests, injected {server_stats['injected']}")
+    for route, count in sorted(server_stats["unmatched"].items()):
+        print(f"  unmatched route: {route} ({count}×)")
+    print(f"Transport: {transport}")
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> list:
+    """Benchmarks whose p50 grew by more than tolerance over the baseline."""
+    return [
+        f"{name}: p50 {r['p50_ms']:.2f}ms vs {baseline[name]['p50_ms']:.2f}ms"
+        for name, r in results.items()
+        if name in baseline and r["p50_ms"] > baseline[name]["p50_ms"] * (1 + tolerance)
+    ]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the examples against a local stand-in server")
+    parser.add_argument("--iterations", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument("--latency-ms", type=float, default=5.0, help="Server latency per request")
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--throttle-rate", type=float, default=0.0)
+    parser.add_argument("--llm-latency-ms", type=float, default=0.0, help="Fake model latency per turn")
+    parser.add_argument("--only", nargs="*", help="Run only benchmarks whose name contains one of these")
+    parser.add_argument("--json", help="Write results to this file")
+    parser.add_argument("--baseline", help="Results file to compare p50s against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed p50 growth over the baseline")
+    args = parser.parse_args()
+
+    mock = MockPurpleFlea(latency_ms=args.latency_ms, jitter_ms=args.jitter_ms,
+                          error_rate=args.error_rate, throttle_rate=args.throttle_rate).start()
+    with tempfile.TemporaryDirectory() as workdir:
+        _configure_environment(mock, workdir)
+        benchmarks = build_benchmarks(args.llm_latency_ms / 1000)
+        if args.only:
+            benchmarks = {n: fn for n, fn in benchmarks.items() if any(part in n for part in args.only)}
+
+        results = {}
+        for name, fn in benchmarks.items():
+            print(f"  running {name}…", file=sys.stderr)
+            with contextlib.redirect_stdout(io.StringIO()):  # the examples print a lot
+                results[name] = run_benchmark(fn, args.iterations, args.concurrency)
+
+        from transport import TRANSPORT_METRICS
+        print_report(results, mock.stats(), dict(TRANSPORT_METRICS))
+    mock.stop()
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for line in regressions:
+            print(f"  REGRESSION {line}")
+        sys.exit(1 if regressions else 0)
@@ -0,0 +1,109 @@
+"""
+Purple Flea Startup Benchmark
+===============================
+How long a fresh worker takes to import an example and finish its first call,
+which is what a short-lived or serverless agent pays on every invocation.
+
+    python benchmarks/startup.py --runs 10
+    python benchmarks/startup.py --importtime full_agent   # slowest imports of one module
+
+Each run is a new interpreter pointed at the local stand-in server
+(mock_server.py), so the numbers include SDK imports, session and client
+construction and the first request, but no network.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+EXAMPLES = os.path.join(HERE, "..", "examples")
+sys.path.insert(0, EXAMPLES)
+
+from mock_server import MockPurpleFlea  # noqa: E402
+
+# module -> first call, run right after the import
+FIRST_CALLS = {
+    "full_agent": 'full_agent.execute_tool("get_market_prices", {"symbols": ["BTC-PERP"]})',
+    "async_agent": 'asyncio.run(async_agent.execute_tool_async("get_market_prices", {"symbols": ["BTC-PERP"]}))',
+    "trading_agent": 'trading_agent.get_market_price("BTC-PERP")',
+    "wallet_agent": 'wallet_agent.check_balances("w_1")',
+    "casino_agent": "casino_agent.play_dice(0.1)",
+    "domains_agent": 'domains_agent.search_domains("ai-agent")',
+}
+
+CHILD = """
+import asyncio, contextlib, io, json, time
+start = time.perf_counter()
+import {module}
+imported = time.perf_counter()
+with contextlib.redirect_stdout(io.StringIO()):
+    {call}
+done = time.perf_counter()
+print(json.dumps({{"import_s": imported - start, "first_call_s": done - imported}}))
+"""
+
+
+def child_env(mock: MockPurpleFlea, workdir: str) -> dict:
+    return {
+        **os.environ,
+        **mock.env(),
+        "PURPLEFLEA_API_KEY": os.environ.get("PURPLEFLEA_API_KEY", "bench"),
+        "ANTHROPIC_API_KEY": os.environ.get("ANTHROPIC_API_KEY", "bench"),
+        "PURPLEFLEA_LEDGER_PATH": os.path.join(workdir, "ledger.db"),
+    }
+
+
+def measure(module: str, env: dict) -> dict:
+    """Import and first-call seconds for module in a fresh interpreter."""
+    code = CHILD.format(module=module, call=FIRST_CALLS[module])
+    result = subprocess.run([sys.executable, "-c", code], cwd=EXAMPLES, env=env,
+                            capture_output=True, text=True, timeout=120)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1] if result.stderr.strip() else "failed")
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def slowest_imports(module: str, env: dict, top: int = 15) -> list:
+    """(cumulative microseconds, package) for the slowest imports of module, via -X importtime."""
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                            cwd=EXAMPLES, env=env, capture_output=True, text=True, timeout=120)
+    rows = []
+    for line in result.stderr.splitlines():
+        if line.startswith("import time:") and "|" in line and "cumulative" not in line:
+            _, cumulative, name = line[len("import time:"):].split("|")
+            rows.append((int(cumulative), name.rstrip()))
+    return sorted(rows, reverse=True)[:top]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure import and first-call latency of the examples")
+    parser.add_argument("modules", nargs="*", default=list(FIRST_CALLS), choices=list(FIRST_CALLS))
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--importtime", action="store_true", help="Show the slowest imports instead")
+    args = parser.parse_args()
+
+    mock = MockPurpleFlea().start()
+    with tempfile.TemporaryDirectory() as workdir:
+        env = child_env(mock, workdir)
+        if args.importtime:
+            for module in args.modules:
+                print(f"\n{module}: slowest imports (cumulative ms)")
+                for micros, name in slowest_imports(module, env):
+                    print(f"  {micros / 1000:>8.1f}  {name}")
+        else:
+            print(f"{'module':<16} {'import ms':>10} {'first call ms':>14} {'total ms':>10}")
+            for module in args.modules:
+                try:
+                    runs = [measure(module, env) for _ in range(args.runs)]
+                except RuntimeError as e:
+                    print(f"{module:<16} ✗ {e}")
+                    continue
+                imported = statistics.median(r["import_s"] for r in runs) * 1000
+                first = statistics.median(r["first_call_s"] for r in runs) * 1000
+                print(f"{module:<16} {imported:>10.1f} {first:>14.1f} {imported + first:>10.1f}")
+    mock.stop()
@@ -0,0 +1,255 @@
+"""
+Purple Flea Async Money Stack Agent
+======================================
+The full Money Stack agent on asyncio, for hosts that run hundreds of agents.
+
+- Awaitable wrappers around the Wallet, Trading, Casino and Domains clients
+- An AsyncAnthropic-driven version of run_money_stack_agent
+- One event loop driving many agent sessions at once
+
+Blocking Purple Flea calls run on a single shared, bounded thread pool
+(PURPLEFLEA_IO_THREADS), so the number of threads stays fixed no matter how
+many sessions the loop is driving. A tool call's TOOL_TIMEOUT_SECONDS starts
+when a worker picks it up, not while it waits in the pool's queue. Each
+session holds at most MAX_PARALLEL_TOOLS workers, counting calls it abandoned
+at their timeout until they actually finish, so a slow API can't let one
+session take over the pool.
+
+Uses the tools, system prompt and clients defined in full_agent.py.
+"""
+
+import asyncio
+import functools
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from compaction import compact_messages
+from lazy import Lazy
+from prompt_cache import CacheStats, with_cache_breakpoint
+import tracing
+from full_agent import (
+    CACHED_SYSTEM,
+    CACHED_TOOLS,
+    MAX_PARALLEL_TOOLS,
+    MODEL,
+    TOOL_TIMEOUT_SECONDS,
+    casino_client,
+    domains_client,
+    execute_tool,
+    timeout_result,
+    trading_client,
+    wallet_client,
+)
+
+IO_EXECUTOR = ThreadPoolExecutor(
+    max_workers=int(os.environ.get("PURPLEFLEA_IO_THREADS", "32")),
+    thread_name_prefix="purpleflea-io",
+)
+
+
+def _make_async_anthropic_client():
+    import anthropic
+
+    return anthropic.AsyncAnthropic(api_key=os.environ.get("ANTHROPIC_API_KEY"))
+
+
+async_anthropic_client = Lazy(_make_async_anthropic_client)
+
+
+class AsyncPurpleFleaClient:
+    """
+    Awaitable view of a blocking Purple Flea client.
+
+    Attribute access mirrors the wrapped client, and every method call becomes
+    a coroutine that runs on IO_EXECUTOR:
+
+        market = await async_trading_client.markets.get("BTC-PERP")
+
+    Coalesced read methods (singleflight.py) are deduplicated on the event
+    loop, so identical concurrent reads share one worker thread and one request.
+    """
+
+    def __init__(self, target, executor: ThreadPoolExecutor = IO_EXECUTOR):
+        self._target = target
+        self._executor = executor
+
+    def __getattr__(self, name: str):
+        attr = getattr(self._target, name)
+        if not callable(attr):
+            return AsyncPurpleFleaClient(attr, self._executor)
+
+        key_for = getattr(attr, "key_for", None)
+
+        async def call(*args, **kwargs):
+            loop = asyncio.get_running_loop()
+            if key_for is None:
+                return await loop.run_in_executor(self._executor, functools.partial(attr, *args, **kwargs))
+            unwrapped = functools.partial(attr.__wrapped__, *args, **kwargs)
+            return await attr.flight.do_async(key_for(*args, **kwargs),
+                                              lambda: loop.run_in_executor(self._executor, unwrapped))
+
+        return call
+
+
+async_wallet_client = AsyncPurpleFleaClient(wallet_client)
+async_trading_client = AsyncPurpleFleaClient(trading_client)
+async_casino_client = AsyncPurpleFleaClient(casino_client)
+async_domains_client = AsyncPurpleFleaClient(domains_client)
+
+
+def _call_soon(loop, callback, *args) -> None:
+    """loop.call_soon_threadsafe from a worker thread, unless the loop has already gone away."""
+    if not loop.is_closed():
+        loop.call_soon_threadsafe(callback, *args)
+
+
+def _set_started(started: asyncio.Future, at: float) -> None:
+    if not started.done():
+        started.set_result(at)
+
+
+async def execute_tool_async(tool_name: str, tool_input: dict, in_flight: asyncio.Semaphore = None) -> str:
+    """
+    Run execute_tool on the shared I/O pool, giving up TOOL_TIMEOUT_SECONDS after a worker starts it.
+
+    in_flight, if given, is held from submission until the worker is done with
+    the call, even one given up on, so it caps the workers a session occupies.
+    """
+    loop = asyncio.get_running_loop()
+    if in_flight is not None:
+        await in_flight.acquire()
+    started = loop.create_future()
+    run_tool = tracing.wrap(execute_tool)
+
+    def run():
+        _call_soon(loop, _set_started, started, time.monotonic())
+        return run_tool(tool_name, tool_input)
+
+    future = IO_EXECUTOR.submit(run)
+    if in_flight is not None:
+        future.add_done_callback(lambda _: _call_soon(loop, in_flight.release))
+    result = asyncio.wrap_future(future)
+    try:
+        # Queued calls wait for a worker without a deadline; the clock starts when one picks it up
+        await asyncio.wait({started, result}, return_when=asyncio.FIRST_COMPLETED)
+        if not started.done():
+            return await result  # finished (or was cancelled) before the start callback ran
+        remaining = started.result() + TOOL_TIMEOUT_SECONDS - time.monotonic()
+        return await asyncio.wait_for(result, timeout=max(remaining, 0))
+    except asyncio.TimeoutError:
+        return timeout_result(tool_name)
+    finally:
+        started.cancel()
+        if not result.done():
+            result.cancel()  # unstarted calls leave the queue; running ones finish in the background
+
+
+async def execute_tools_async(tool_blocks: list, label: str = "", limiter=None,
+                              in_flight: asyncio.Semaphore = None) -> list[dict]:
+    """
+    Run one turn's tool calls concurrently and return their results in order.
+
+    in_flight is the session's cap on occupied workers (see execute_tool_async);
+    by default the turn gets its own, of MAX_PARALLEL_TOOLS.
+    """
+    if in_flight is None:
+        in_flight = asyncio.Semaphore(MAX_PARALLEL_TOOLS)
+
+    async def run(block) -> str:
+        if limiter is not None:
+            await limiter.before_tool(block.name)
+        print(f"{label}  → Using tool: {block.name}({block.input})")
+        return await execute_tool_async(block.name, block.input, in_flight)
+
+    results = await asyncio.gather(*(run(block) for block in tool_blocks))
+
+    tool_results = []
+    for block, result in zip(tool_blocks, results):
+        print(f"{label}  ← Result: {result}")
+        tool_results.append({
+            "type": "tool_result",
+            "tool_use_id": block.id,
+            "content": result,
+        })
+    return tool_results
+
+
+async def run_money_stack_agent_async(task: str, session: str = "agent", limiter=None) -> str:
+    """
+    Asyncio version of run_money_stack_agent; many can share one event loop.
+
+    limiter, if given, is awaited before every model call (limiter.before_llm())
+    and tool call (limiter.before_tool(name)), e.g. fleet_runner.FleetRateLimiter.
+    """
+    label = f"[{session}]"
+    print(f"{label} Task: {task}")
+
+    messages = [{"role": "user", "content": task}]
+    cache_stats = CacheStats()
+    in_flight = asyncio.Semaphore(MAX_PARALLEL_TOOLS)  # across turns, so abandoned calls still count
+
+    while True:
+        request_messages, compaction = compact_messages(messages)
+        if compaction["tokens_saved"]:
+            print(f"{label}  ⋯ History compacted: saved ~{compaction['tokens_saved']:,} tokens")
+
+        # One turn span per model call, parent of its llm span and of the tool spans
+        with tracing.span("turn", MODEL):
+            if limiter is not None:
+                await limiter.before_llm()
+            with tracing.span("llm", MODEL) as span:
+                response = await async_anthropic_client.messages.create(
+                    model=MODEL,
+                    max_tokens=4096,
+                    system=CACHED_SYSTEM,
+                    tools=CACHED_TOOLS,
+                    messages=with_cache_breakpoint(request_messages),
+                )
+                if span:
+                    span.set(**tracing.usage_attrs(response.usage), stop_reason=response.stop_reason)
+            cache_stats.record(response.usage)
+
+            for block in response.content:
+                if hasattr(block, "text"):
+                    print(f"{label} Agent: {block.text}")
+
+            if response.stop_reason != "tool_use":
+                break
+
+            tool_blocks = [block for block in response.content if block.type == "tool_use"]
+            tool_results = await execute_tools_async(tool_blocks, label=label, limiter=limiter, in_flight=in_flight)
+
+        messages.append({"role": "assistant", "content": response.content})
+        messages.append({"role": "user", "content": tool_results})
+
+    print(f"{label} Prompt cache: {cache_stats.summary()}")
+    return "Task completed."
+
+
+async def run_agent_sessions(tasks: list[str], max_sessions: int = 100, limiter=None) -> list:
+    """
+    Drive many agent sessions on the current event loop.
+    At most max_sessions run at once; a failed session returns its exception.
+    """
+    limit = asyncio.Semaphore(max_sessions)
+
+    async def run(index: int, task: str) -> str:
+        async with limit:
+            return await run_money_stack_agent_async(task, session=f"agent-{index}", limiter=limiter)
+
+    return await asyncio.gather(
+        *(run(i, task) for i, task in enumerate(tasks)),
+        return_exceptions=True,
+    )
+
+
+if __name__ == "__main__":
+    tasks = [
+        "Check BTC and ETH prices and report the bigger 24h mover.",
+        "Search for available domains with 'ai-agent' in the name.",
+        "Check the TSLA-PERP and NVDA-PERP prices.",
+    ]
+    results = asyncio.run(run_agent_sessions(tasks))
+    for task, result in zip(tasks, results):
+        print(f"{task} → {result}")
@@ -11,21 +11,19 @@ Referral code STARTER earns 10% of house edge.
 Sign up: https://purpleflea.com/referral?code=STARTER
 """
 
-import os
 import json
 import hashlib
 import hmac
+import os
 from dotenv import load_dotenv
-from purpleflea import CasinoClient
+
+from clients import lazy_client
+from ledger import ledger
 
 load_dotenv()
 
 # 10% referral on casino fees with code STARTER
-client = CasinoClient(
-    api_key=os.environ["PURPLEFLEA_API_KEY"],
-    referral_code=os.environ.get("PURPLEFLEA_REFERRAL_CODE", "STARTER"),
-    base_url=os.environ.get("PURPLEFLEA_CASINO_API", "https://casino.purpleflea.com/api/v1"),
-)
+client = lazy_client("CasinoClient", "casino")
 
 
 def list_games() -> list:
@@ -51,6 +49,8 @@ def play_dice(bet_amount: float, target: int = 50, over: bool = True) -> dict:
         bet_amount=bet_amount,
         options={"target": target, "over": over},
     )
+    ledger.record("casino", "bet", subject="dice", amount=bet_amount,
+                  pnl=result.payout - bet_amount if result.won else -bet_amount, roll=result.roll, won=result.won)
     print(f"\nDice Roll:")
     print(f"  Bet: ${bet_amount:.2f} | Target: {'>' if over else '<'}{target}")
     print(f"  Result: {result.roll}")
@@ -68,6 +68,8 @@ def play_coinflip(bet_amount: float, choice: str = "heads") -> dict:
         bet_amount=bet_amount,
         options={"choice": choice},
     )
+    ledger.record("casino", "bet", subject="coinflip", amount=bet_amount,
+                  pnl=result.profit if result.won else -bet_amount, outcome=result.outcome, won=result.won)
     print(f"\nCoin Flip:")
     print(f"  Bet: ${bet_amount:.2f} on {choice}")
     print(f"  Result: {result.outcome}")
@@ -96,16 +98,112 @@ def verify_game_fairness(result: dict, server_seed: str) -> bool:
 def get_game_history(limit: int = 10) -> list:
     """Get recent game history."""
     history = client.games.history(limit=limit)
-    wins = sum(1 for g in history if g["won"])
-    total_wagered = sum(g["bet_amount"] for g in history)
-    total_pnl = sum(g["payout"] - g["bet_amount"] for g in history)
+    stats = EMPTY_STATS
+    for game in reversed(history):  # history is newest first
+        stats = merge_stats(stats, round_stats(game))
     print(f"\nGame History (last {limit}):")
-    print(f"  Win rate: {wins}/{len(history)} ({wins/len(history)*100:.0f}%)")
-    print(f"  Total wagered: ${total_wagered:.2f}")
-    print(f"  Net P&L: ${total_pnl:+.2f}")
+    print_stats(stats)
     return history
 
 
+# --- Full history: paged, one pass, checkpointed -----------------------------
+
+HISTORY_CHECKPOINT = os.environ.get("PURPLEFLEA_HISTORY_CHECKPOINT", "casino_history_checkpoint.json")
+
+# Aggregates over a run of rounds in play order. pnl is the run's net P&L,
+# peak/trough the highest/lowest cumulative P&L reached from its start (0
+# included), and max_drawdown the largest peak-to-trough fall inside it.
+EMPTY_STATS = {"rounds": 0, "wins": 0, "wagered": 0.0, "pnl": 0.0, "peak": 0.0, "trough": 0.0, "max_drawdown": 0.0}
+
+
+def round_stats(game: dict) -> dict:
+    """Aggregates for a single round."""
+    pnl = game["payout"] - game["bet_amount"]
+    return {
+        "rounds": 1,
+        "wins": 1 if game["won"] else 0,
+        "wagered": game["bet_amount"],
+        "pnl": pnl,
+        "peak": max(pnl, 0.0),
+        "trough": min(pnl, 0.0),
+        "max_drawdown": max(-pnl, 0.0),
+    }
+
+
+def merge_stats(earlier: dict, later: dict) -> dict:
+    """Aggregates for earlier followed by later; lets rounds be folded in either direction."""
+    return {
+        "rounds": earlier["rounds"] + later["rounds"],
+        "wins": earlier["wins"] + later["wins"],
+        "wagered": earlier["wagered"] + later["wagered"],
+        "pnl": earlier["pnl"] + later["pnl"],
+        "peak": max(earlier["peak"], earlier["pnl"] + later["peak"]),
+        "trough": min(earlier["trough"], earlier["pnl"] + later["trough"]),
+        "max_drawdown": max(
+            earlier["max_drawdown"],
+            later["max_drawdown"],
+            # fall from earlier's peak to its end, then on to later's lowest point
+            earlier["peak"] - earlier["pnl"] - later["trough"],
+        ),
+    }
+
+
+def print_stats(stats: dict) -> None:
+    rounds = stats["rounds"]
+    win_rate = f"{stats['wins'] / rounds * 100:.0f}%" if rounds else "n/a"
+    print(f"  Win rate: {stats['wins']}/{rounds} ({win_rate})")
+    print(f"  Total wagered: ${stats['wagered']:.2f}")
+    print(f"  Net P&L: ${stats['pnl']:+.2f}")
+    print(f"  Max drawdown: ${stats['max_drawdown']:.2f}")
+
+
+def iter_game_history(page_size: int = 100, stop_at_id: str = None):
+    """
+    Yield every round, newest first, one page at a time.
+    Stops early at stop_at_id (exclusive), the newest round seen by a previous run.
+    """
+    cursor = None
+    while True:
+        page = client.games.history(limit=page_size, cursor=cursor)
+        for game in page:
+            if stop_at_id is not None and game["id"] == stop_at_id:
+                return
+            yield game
+        if len(page) < page_size:
+            return
+        cursor = page[-1]["id"]
+
+
+def summarize_game_history(checkpoint_path: str = HISTORY_CHECKPOINT, page_size: int = 100) -> dict:
+    """
+    Win rate, wagered total, net P&L and max drawdown over the agent's entire history.
+
+    Rounds are folded as they stream in, so memory stays constant. Totals are
+    saved to checkpoint_path, and the next run only fetches rounds played since.
+    """
+    checkpoint = {"newest_id": None, "stats": EMPTY_STATS}
+    if os.path.exists(checkpoint_path):
+        with open(checkpoint_path) as f:
+            checkpoint = json.load(f)
+
+    new_stats = EMPTY_STATS
+    newest_id = checkpoint["newest_id"]
+    for i, game in enumerate(iter_game_history(page_size, stop_at_id=checkpoint["newest_id"])):
+        if i == 0:
+            newest_id = game["id"]
+        new_stats = merge_stats(round_stats(game), new_stats)  # newest first: prepend
+
+    stats = merge_stats(checkpoint["stats"], new_stats)
+    tmp = f"{checkpoint_path}.tmp"  # replaced in one step, so a crash never leaves half a checkpoint
+    with open(tmp, "w") as f:
+        json.dump({"newest_id": newest_id, "stats": stats}, f)
+    os.replace(tmp, checkpoint_path)
+
+    print(f"\nFull Game History ({new_stats['rounds']} new rounds):")
+    print_stats(stats)
+    return stats
+
+
 if __name__ == "__main__":
     print("=== Purple Flea Casino Agent (ref: STARTER) ===\n")
     print("Casino API: https://casino.purpleflea.com")
@@ -118,3 +216,4 @@ if __name__ == "__main__":
     result = play_dice(bet_amount=0.10, target=50, over=True)
     coin = play_coinflip(bet_amount=0.10, choice="heads")
     history = get_game_history(limit=5)
+    totals = summarize_game_history()
@@ -0,0 +1,130 @@
+"""
+Purple Flea Shared Client Setup
+=================================
+Builds Wallet, Trading, Casino and Domains clients that share one HTTP
+transport.
+
+All four products use the same API key and live on sibling hosts, so one
+keep-alive requests.Session with a connection pool per host serves them all.
+Pooled connections stay open between calls, so a short call like
+markets.get reuses an established TLS connection instead of paying for a
+fresh TCP + TLS handshake every time.
+
+Pool sizes are per host:
+  PURPLEFLEA_POOL_SIZE          default for every host (10)
+  PURPLEFLEA_<PRODUCT>_POOL_SIZE  override for one product, e.g. PURPLEFLEA_TRADING_POOL_SIZE
+
+Each host's adapter is a transport.RateLimitedAdapter, which handles client-side
+rate limiting and retries of 429/5xx responses for every client.
+
+Nothing is built at import time. lazy_client() returns a stand-in that imports
+the purpleflea SDK and builds the session and client the first time it is
+used, so a worker that only trades never pays for the other three clients:
+
+    trading_client = lazy_client("TradingClient", "trading")
+"""
+
+import inspect
+import os
+import threading
+import warnings
+from urllib.parse import urlsplit
+
+import requests
+from dotenv import load_dotenv
+
+from lazy import Lazy
+from singleflight import READ_METHODS, coalesce_reads
+from transport import RateLimitedAdapter
+
+load_dotenv()
+
+API_KEY = os.environ["PURPLEFLEA_API_KEY"]
+REFERRAL_CODE = os.environ.get("PURPLEFLEA_REFERRAL_CODE", "STARTER")
+
+BASE_URLS = {
+    "wallet": os.environ.get("PURPLEFLEA_WALLET_API", "https://wallet.purpleflea.com/api/v1"),
+    "trading": os.environ.get("PURPLEFLEA_TRADING_API", "https://trading.purpleflea.com/api/v1"),
+    "casino": os.environ.get("PURPLEFLEA_CASINO_API", "https://casino.purpleflea.com/api/v1"),
+    "domains": os.environ.get("PURPLEFLEA_DOMAINS_API", "https://domains.purpleflea.com/api/v1"),
+}
+
+DEFAULT_POOL_SIZE = int(os.environ.get("PURPLEFLEA_POOL_SIZE", "10"))
+
+
+def pool_size(product: str) -> int:
+    """Connection pool size for one product's host."""
+    return int(os.environ.get(f"PURPLEFLEA_{product.upper()}_POOL_SIZE", DEFAULT_POOL_SIZE))
+
+
+def make_session() -> requests.Session:
+    """
+    Create a keep-alive session with one HTTP/1.1 connection pool per Purple Flea host.
+
+    pool_block=True makes a burst wait for a pooled connection rather than
+    opening throwaway ones, which would each cost a new TLS handshake.
+    """
+    session = requests.Session()
+    session.headers.update({"Connection": "keep-alive"})
+    for product, base_url in BASE_URLS.items():
+        parts = urlsplit(base_url)
+        adapter = RateLimitedAdapter(
+            pool_connections=1,
+            pool_maxsize=pool_size(product),
+            pool_block=True,
+        )
+        session.mount(f"{parts.scheme}://{parts.netloc}/", adapter)
+    return session
+
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session() -> requests.Session:
+    """The one transport every client in the process shares, created on first use."""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = make_session()
+    return _session
+
+
+def accepts_session(client_cls) -> bool:
+    """Whether client_cls's constructor takes session= (by name or through **kwargs)."""
+    try:
+        params = inspect.signature(client_cls).parameters.values()
+    except (TypeError, ValueError):
+        return True  # not introspectable; pass it and let a real mismatch raise
+    return any(p.name == "session" or p.kind is p.VAR_KEYWORD for p in params)
+
+
+def build_client(client_cls, product: str):
+    """
+    Construct a Purple Flea client for product on the shared session,
+    with its read methods coalesced (see singleflight.py).
+    """
+    kwargs = {
+        "api_key": API_KEY,
+        "referral_code": REFERRAL_CODE,
+        "base_url": BASE_URLS[product],
+    }
+    if accepts_session(client_cls):
+        client = client_cls(session=get_session(), **kwargs)
+    else:
+        # Older SDK releases don't accept a session and keep their own transport
+        warnings.warn(f"{client_cls.__name__} does not accept session=; using its own connection pool "
+                      "without the shared rate limiting")
+        client = client_cls(**kwargs)
+    return coalesce_reads(client, READ_METHODS[product], prefix=f"{product}.")
+
+
+def lazy_client(class_name: str, product: str) -> Lazy:
+    """A Purple Flea client (e.g. "TradingClient") that is imported and built on first use."""
+    def build():
+        import purpleflea
+
+        return build_client(getattr(purpleflea, class_name), product)
+
+    return Lazy(build)
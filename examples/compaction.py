@@ -0,0 +1,113 @@
+"""
+Purple Flea Agent History Compaction
+======================================
+Keeps the prompt an agent loop resends on every turn within a token budget.
+
+The agent loop keeps the full message history and, before each
+messages.create call, sends a compacted copy:
+
+1. While the history fits the budget it is sent unchanged, so tool output
+   isn't thrown away and the cached prompt prefix stays stable.
+2. Over budget, the original task and the last keep_turns tool rounds stay
+   verbatim. Older tool results (balance dumps, domain lists, ...) are cut to
+   a short head, oldest round first, until the history fits.
+3. If that is still over budget, the oldest rounds are dropped whole and
+   replaced by a one-line note listing the tools they called.
+
+Tokens are estimated at ~4 characters each, which is accurate enough for
+budgeting and needs no extra API call.
+"""
+
+import json
+import os
+
+TOKEN_BUDGET = int(os.environ.get("PURPLEFLEA_HISTORY_TOKEN_BUDGET", "20000"))
+KEEP_TURNS = int(os.environ.get("PURPLEFLEA_HISTORY_KEEP_TURNS", "4"))
+OLD_RESULT_CHARS = 200
+
+
+def _field(block, name: str, default=None):
+    """Read a content block field whether it is a dict or an SDK object."""
+    if isinstance(block, dict):
+        return block.get(name, default)
+    return getattr(block, name, default)
+
+
+def estimate_tokens(messages: list) -> int:
+    """Rough token count for a message list (~4 chars per token)."""
+    chars = 0
+    for message in messages:
+        content = message["content"]
+        if isinstance(content, str):
+            chars += len(content)
+            continue
+        for block in content:
+            kind = _field(block, "type")
+            if kind == "text":
+                chars += len(_field(block, "text", ""))
+            elif kind == "tool_use":
+                chars += len(_field(block, "name", "")) + len(json.dumps(_field(block, "input", {}), default=str))
+            elif kind == "tool_result":
+                chars += len(str(_field(block, "content", "")))
+    return chars // 4
+
+
+def _truncate_results(message: dict) -> dict:
+    """Copy of a tool_result message with long results cut down to OLD_RESULT_CHARS."""
+    if isinstance(message["content"], str):
+        return message
+    content = []
+    for block in message["content"]:
+        result = block.get("content") if isinstance(block, dict) else None
+        if block.get("type") == "tool_result" and isinstance(result, str) and len(result) > OLD_RESULT_CHARS:
+            cut = len(result) - OLD_RESULT_CHARS
+            block = {**block, "content": f"{result[:OLD_RESULT_CHARS]}… [{cut} chars truncated]"}
+        content.append(block)
+    return {**message, "content": content}
+
+
+def _tool_names(message: dict) -> list:
+    return [_field(b, "name") for b in message["content"] if _field(b, "type") == "tool_use"]
+
+
+def compact_messages(messages: list, token_budget: int = TOKEN_BUDGET, keep_turns: int = KEEP_TURNS) -> tuple:
+    """
+    Return (compacted_messages, stats) without modifying messages.
+
+    messages must look like the agent loop's history: the user task followed
+    by (assistant, user tool_result) pairs. stats has tokens_before,
+    tokens_after and tokens_saved.
+    """
+    before = estimate_tokens(messages)
+    if before <= token_budget:
+        return list(messages), {"tokens_before": before, "tokens_after": before, "tokens_saved": 0}
+
+    task, rounds = messages[0], messages[1:]
+    pairs = [rounds[i:i + 2] for i in range(0, len(rounds), 2)]
+    split = max(len(pairs) - keep_turns, 0)
+    old, recent = pairs[:split], pairs[split:]
+
+    total = before
+    for i, (assistant, user) in enumerate(old):
+        if total <= token_budget:
+            break
+        truncated = _truncate_results(user)
+        total += estimate_tokens([truncated]) - estimate_tokens([user])
+        old[i] = [assistant, truncated]
+
+    dropped = []
+    while old and total > token_budget:
+        pair = old.pop(0)
+        total -= estimate_tokens(pair)
+        dropped.extend(_tool_names(pair[0]))
+    compacted = [task, *(m for pair in old + recent for m in pair)]
+
+    if dropped:
+        note = f"[Earlier steps omitted to save context: called {', '.join(dropped)}]"
+        task_content = task["content"]
+        if isinstance(task_content, str):
+            task_content = [{"type": "text", "text": task_content}]
+        compacted[0] = {**task, "content": [*task_content, {"type": "text", "text": note}]}
+
+    after = estimate_tokens(compacted)
+    return compacted, {"tokens_before": before, "tokens_after": after, "tokens_saved": before - after}
@@ -0,0 +1,130 @@
+"""
+Purple Flea Domain Operations
+===============================
+Bulk renewals and DNS updates for portfolios of tens of thousands of domains.
+
+    ops = DomainOps(client)
+    ops.load()                                    # paged fetch + expiry index
+    ops.renew_expiring(days_threshold=30)         # concurrent renewals
+    ops.apply_dns({"a.com": records, ...})        # only domains whose records differ
+
+Owned domains are fetched one page at a time and kept in an ExpiryIndex sorted
+by days until expiry, so "everything expiring within N days" is a bisect.
+Renewals and DNS updates run on a bounded thread pool. Before a record set is
+pushed, it is compared with the domain's current records (dns.get_records)
+and skipped when nothing changed.
+
+Operations return summary dicts instead of printing a line per domain; every
+renewal and DNS change is recorded in the ledger.
+"""
+
+import bisect
+from concurrent.futures import ThreadPoolExecutor
+
+from ledger import ledger
+
+
+def iter_owned_domains(client, page_size: int = 500):
+    """Yield every owned domain dict, one page at a time."""
+    cursor = None
+    while True:
+        page = client.domains.list(limit=page_size, cursor=cursor)
+        yield from page
+        if len(page) < page_size:
+            return
+        cursor = page[-1]["domain"]
+
+
+class ExpiryIndex:
+    """Owned domains sorted by days until expiry."""
+
+    def __init__(self, domains):
+        entries = sorted((d["days_until_expiry"], d["domain"]) for d in domains)
+        self._days = [days for days, _ in entries]
+        self._domains = [domain for _, domain in entries]
+
+    def __len__(self) -> int:
+        return len(self._domains)
+
+    def expiring_within(self, days: int) -> list:
+        """Domains with fewer than days left, soonest first."""
+        return self._domains[:bisect.bisect_left(self._days, days)]
+
+    def histogram(self, edges=(7, 30, 90, 365)) -> dict:
+        """{"<7d": n, "<30d": n, ..., ">=365d": n} counts of domains per expiry bucket."""
+        counts, previous = {}, 0
+        for edge in edges:
+            position = bisect.bisect_left(self._days, edge)
+            counts[f"<{edge}d"] = position - previous
+            previous = position
+        counts[f">={edges[-1]}d"] = len(self._days) - previous
+        return counts
+
+
+def _record_key(record: dict) -> tuple:
+    return record["type"], record["name"], str(record["value"])
+
+
+def diff_records(current: list, desired: list) -> dict:
+    """Records to add (new or with a changed TTL) and to remove to turn current into desired."""
+    current_by_key = {_record_key(r): r for r in current}
+    desired_by_key = {_record_key(r): r for r in desired}
+    return {
+        "add": [r for key, r in desired_by_key.items()
+                if key not in current_by_key or current_by_key[key].get("ttl") != r.get("ttl")],
+        "remove": [r for key, r in current_by_key.items() if key not in desired_by_key],
+    }
+
+
+class DomainOps:
+    """Paged inventory plus concurrent renewals and DNS updates."""
+
+    def __init__(self, client, max_workers: int = 16):
+        self.client = client
+        self.max_workers = max_workers
+        self.index = ExpiryIndex([])
+
+    def load(self, page_size: int = 500) -> ExpiryIndex:
+        """Fetch every owned domain and rebuild the expiry index."""
+        self.index = ExpiryIndex(iter_owned_domains(self.client, page_size))
+        return self.index
+
+    def _run(self, fn, items) -> dict:
+        """Apply fn to each item on the pool; fn returns a status string or raises."""
+        summary = {"failed": {}}
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            futures = {item: pool.submit(fn, item) for item in items}
+            for item, future in futures.items():
+                try:
+                    status = future.result()
+                except Exception as e:
+                    summary["failed"][item] = str(e)
+                else:
+                    summary[status] = summary.get(status, 0) + 1
+        return summary
+
+    def renew_expiring(self, days_threshold: int = 30, years: int = 1) -> dict:
+        """Renew every domain with fewer than days_threshold days left; returns {"renewed": n, "failed": {...}}."""
+        def renew(domain):
+            self.client.domains.renew(domain, years=years)
+            ledger.record("domains", "renew", subject=domain, years=years)
+            return "renewed"
+
+        return self._run(renew, self.index.expiring_within(days_threshold))
+
+    def apply_dns(self, desired: dict) -> dict:
+        """
+        Bring each domain's records to desired[domain].
+        Returns {"updated": n, "unchanged": n, "failed": {...}}.
+        """
+        def apply(domain):
+            records = desired[domain]
+            if hasattr(self.client.dns, "get_records"):
+                changes = diff_records(self.client.dns.get_records(domain=domain), records)
+                if not changes["add"] and not changes["remove"]:
+                    return "unchanged"
+            self.client.dns.set_records(domain=domain, records=records)
+            ledger.record("domains", "dns", subject=domain, records=len(records))
+            return "updated"
+
+        return self._run(apply, list(desired))
@@ -0,0 +1,134 @@
+"""
+Purple Flea Bulk Domain Search
+================================
+Availability checks for thousands of candidate names × TLDs, for agents that
+generate names and keep whichever are free.
+
+    for result in bulk_search(client, names, tlds=[".com", ".ai"]):
+        print(result["domain"], result["price"])   # best-ranked available first
+
+Candidates are ranked by the order of names, then tlds. They are checked in
+batched calls run concurrently: domains.search_many(domains=[...]) when the
+SDK has it, otherwise one domains.search(name=, tlds=[...]) per name. Results
+are yielded in rank order as soon as every better-ranked candidate has been
+settled, so a caller that only wants the first few can stop early.
+
+Domains found taken are remembered in a TakenCache for a few minutes, so
+candidates an agent retries are answered locally. Available domains are
+never cached because they can be registered at any moment.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+DEFAULT_TLDS = [".com", ".io", ".ai", ".xyz", ".org", ".net"]
+
+
+class TakenCache:
+    """TTL + LRU set of domains recently seen as taken."""
+
+    def __init__(self, ttl: float = 600.0, max_entries: int = 100_000):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._taken = OrderedDict()  # domain -> seen_at
+        self._lock = threading.Lock()
+
+    def __contains__(self, domain: str) -> bool:
+        with self._lock:
+            seen_at = self._taken.get(domain)
+            if seen_at is not None and time.monotonic() - seen_at < self.ttl:
+                self.hits += 1
+                return True
+            if seen_at is not None:
+                del self._taken[domain]
+            self.misses += 1
+            return False
+
+    def add(self, domain: str) -> None:
+        with self._lock:
+            self._taken[domain] = time.monotonic()
+            self._taken.move_to_end(domain)
+            while len(self._taken) > self.max_entries:
+                self._taken.popitem(last=False)
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {"entries": len(self._taken), "hits": self.hits, "misses": self.misses,
+                    "hit_rate": self.hits / lookups if lookups else 0.0}
+
+
+TAKEN_CACHE = TakenCache()
+
+
+def _search_batch(client, batch: list) -> list:
+    """Check one batch of (rank, name, tld); returns the API's result dicts."""
+    if hasattr(client.domains, "search_many"):
+        return client.domains.search_many(domains=[name + tld for _, name, tld in batch])
+    return client.domains.search(name=batch[0][1], tlds=[tld for _, _, tld in batch])
+
+
+def _batches(candidates: list, batch_size: int, bulk: bool) -> list:
+    if bulk:
+        return [candidates[i:i + batch_size] for i in range(0, len(candidates), batch_size)]
+    by_name = OrderedDict()
+    for candidate in candidates:
+        by_name.setdefault(candidate[1], []).append(candidate)
+    return list(by_name.values())
+
+
+def bulk_search(client, names: list, tlds: list = None, batch_size: int = 100, max_workers: int = 8,
+                cache: TakenCache = TAKEN_CACHE, include_taken: bool = False):
+    """
+    Yield result dicts ({"domain", "available", "price", ...}) in rank order.
+
+    Only available domains are yielded unless include_taken is set. A domain
+    whose batch failed is yielded with include_taken as
+    {"domain", "available": None, "error"}.
+    """
+    tlds = tlds or DEFAULT_TLDS
+    settled = {}  # rank -> result dict, or None to skip
+    candidates = []
+    for rank, (name, tld) in enumerate((name, tld) for name in names for tld in tlds):
+        domain = name + tld
+        if domain in cache:
+            settled[rank] = {"domain": domain, "available": False, "cached": True} if include_taken else None
+        else:
+            candidates.append((rank, name, tld))
+    next_rank = 0
+
+    def release():
+        nonlocal next_rank
+        while next_rank in settled:
+            result = settled.pop(next_rank)
+            next_rank += 1
+            if result is not None:
+                yield result
+
+    yield from release()
+    batches = _batches(candidates, batch_size, hasattr(client.domains, "search_many"))
+    pool = ThreadPoolExecutor(max_workers=max_workers)
+    try:
+        futures = {pool.submit(_search_batch, client, batch): batch for batch in batches}
+        for future in as_completed(futures):
+            batch = futures[future]
+            try:
+                by_domain = {r["domain"]: r for r in future.result()}
+                error = None
+            except Exception as e:
+                by_domain, error = {}, str(e)
+            for rank, name, tld in batch:
+                domain = name + tld
+                result = by_domain.get(domain)
+                if result is None:
+                    result = {"domain": domain, "available": None, "error": error or "missing from response"}
+                elif not result["available"]:
+                    cache.add(domain)
+                settled[rank] = result if result["available"] or include_taken else None
+            yield from release()
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
@@ -11,18 +11,17 @@ Referral code STARTER earns 15% of registration fees.
 Sign up: https://purpleflea.com/referral?code=STARTER
 """
 
-import os
 from dotenv import load_dotenv
-from purpleflea import DomainsClient
+
+from clients import lazy_client
+from domain_ops import DomainOps
+from domain_search import TAKEN_CACHE, bulk_search
+from ledger import ledger
 
 load_dotenv()
 
 # 15% referral on domain registrations with code STARTER
-client = DomainsClient(
-    api_key=os.environ["PURPLEFLEA_API_KEY"],
-    referral_code=os.environ.get("PURPLEFLEA_REFERRAL_CODE", "STARTER"),
-    base_url=os.environ.get("PURPLEFLEA_DOMAINS_API", "https://domains.purpleflea.com/api/v1"),
-)
+client = lazy_client("DomainsClient", "domains")
 
 
 def search_domains(name: str, tlds: list[str] = None) -> list:
@@ -40,6 +39,21 @@ def search_domains(name: str, tlds: list[str] = None) -> list:
     return available
 
 
+def search_domains_bulk(names: list[str], tlds: list[str] = None, limit: int = 20) -> list:
+    """Check many candidate names at once; returns up to limit available domains, best-ranked first."""
+    available = []
+    for result in bulk_search(client, names, tlds):
+        available.append(result)
+        if len(available) >= limit:
+            break
+    print(f"\nBulk search over {len(names)} names: {len(available)} available")
+    for result in available:
+        print(f"  {result['domain']}: ${result['price']:.2f}/yr")
+    cache = TAKEN_CACHE.stats()
+    print(f"  Taken-cache: {cache['entries']} domains, {cache['hit_rate']:.0%} hit rate")
+    return available
+
+
 def register_domain(
     domain: str,
     years: int = 1,
@@ -53,6 +67,8 @@ def register_domain(
         auto_renew=auto_renew,
         whois_privacy=privacy,
     )
+    ledger.record("domains", "register", subject=registration.domain, years=years,
+                  expires_at=registration.expires_at)
     print(f"\nDomain registered:")
     print(f"  Domain: {registration.domain}")
     print(f"  Expires: {registration.expires_at}")
@@ -64,6 +80,7 @@ def register_domain(
 def set_dns_records(domain: str, records: list[dict]) -> dict:
     """Configure DNS records for a domain."""
     result = client.dns.set_records(domain=domain, records=records)
+    ledger.record("domains", "dns", subject=domain, records=len(records))
     print(f"\nDNS records updated for {domain}:")
     for record in records:
         print(f"  {record['type']} {record['name']} → {record['value']}")
@@ -89,16 +106,28 @@ def list_owned_domains() -> list:
     return domains
 
 
-def renew_expiring_domains(days_threshold: int = 30) -> list:
+def renew_expiring_domains(days_threshold: int = 30) -> dict:
     """Auto-renew domains expiring within threshold."""
-    domains = list_owned_domains()
-    renewed = []
-    for domain in domains:
-        if domain["days_until_expiry"] < days_threshold:
-            result = client.domains.renew(domain["domain"], years=1)
-            print(f"  Renewed {domain['domain']} for 1 year")
-            renewed.append(result)
-    return renewed
+    ops = DomainOps(client)
+    index = ops.load()
+    summary = ops.renew_expiring(days_threshold)
+    print(f"\nOwned domains: {len(index)} | expiring: {index.histogram()}")
+    print(f"  Renewed {summary.get('renewed', 0)}, failed {len(summary['failed'])}")
+    for domain, error in list(summary["failed"].items())[:10]:
+        print(f"  ✗ {domain}: {error}")
+    return summary
+
+
+def point_domains_to_server(domains: list[str], ip_address: str) -> dict:
+    """Point many domains at one server, skipping those already pointing there."""
+    records = [
+        {"type": "A", "name": "@", "value": ip_address, "ttl": 300},
+        {"type": "A", "name": "www", "value": ip_address, "ttl": 300},
+    ]
+    summary = DomainOps(client).apply_dns({domain: records for domain in domains})
+    print(f"\nDNS → {ip_address}: {summary.get('updated', 0)} updated, "
+          f"{summary.get('unchanged', 0)} unchanged, {len(summary['failed'])} failed")
+    return summary
 
 
 if __name__ == "__main__":
@@ -109,6 +138,10 @@ if __name__ == "__main__":
     # Search for domain availability
     available = search_domains("my-ai-agent", tlds=[".com", ".io", ".ai"])
 
+    # Check a batch of generated candidates in one go
+    candidates = search_domains_bulk([f"agent-{word}" for word in ("alpha", "nexus", "forge", "pilot")],
+                                     tlds=[".com", ".ai"], limit=5)
+
     # List owned domains
     owned = list_owned_domains()
 
@@ -0,0 +1,213 @@
+"""
+Purple Flea Agent Fleet Runner
+================================
+Runs a queue of agent tasks across worker processes, each driving several
+asyncio agents (async_agent.py), under one fleet-wide rate limit.
+
+- Tasks sit on one shared queue. Each worker process runs several agents
+  on its own event loop, and each agent takes the next task as soon as it
+  finishes one, so a slow task never holds up the others.
+- One token bucket per Purple Flea host (wallet, trading, casino, domains)
+  and one for the Anthropic API live in shared memory, so the limit holds
+  for the whole fleet, not per process. Host buckets are charged per HTTP
+  request by transport.RateLimitedAdapter; the Anthropic one per model call.
+- Per-task latency and overall throughput are aggregated into one report.
+
+    python fleet_runner.py tasks.txt --processes 4 --agents 8
+
+tasks.txt holds one task per line. Rates (requests/second, fleet-wide):
+  PURPLEFLEA_FLEET_RPS   per Purple Flea host (default 20)
+  ANTHROPIC_FLEET_RPS    Anthropic API (default 5)
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+PRODUCTS = ("wallet", "trading", "casino", "domains")
+
+
+class SharedTokenBucket:
+    """Token bucket whose state lives in shared memory, usable from any worker process."""
+
+    def __init__(self, rate: float, capacity: float = None, ctx=multiprocessing):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(rate, 1.0)
+        self._tokens = ctx.Value("d", self.capacity, lock=False)
+        self._updated = ctx.Value("d", time.time(), lock=False)
+        self._lock = ctx.Lock()
+
+    def try_acquire(self, tokens: float = 1.0) -> float:
+        """Take tokens if available and return 0, otherwise return seconds to wait."""
+        with self._lock:
+            now = time.time()
+            available = min(self.capacity, self._tokens.value + (now - self._updated.value) * self.rate)
+            self._updated.value = now
+            if available >= tokens:
+                self._tokens.value = available - tokens
+                return 0.0
+            self._tokens.value = available
+            return (tokens - available) / self.rate
+
+    def acquire(self, tokens: float = 1.0) -> None:
+        """Block the calling thread until tokens are granted."""
+        while (wait := self.try_acquire(tokens)) > 0:
+            time.sleep(wait)
+
+    async def acquire_async(self, tokens: float = 1.0) -> None:
+        """Wait without blocking the event loop until tokens are granted."""
+        while (wait := self.try_acquire(tokens)) > 0:
+            await asyncio.sleep(wait)
+
+
+class FleetRateLimiter:
+    """
+    The limiter hooks run_money_stack_agent_async awaits before model and tool calls.
+    Only model calls are charged here: a tool call may send many requests or none
+    (cache hits), so host buckets are charged by the transport instead.
+    """
+
+    def __init__(self, buckets: dict):
+        self.buckets = buckets
+        self.waited = 0.0
+
+    async def _take(self, key: str) -> None:
+        bucket = self.buckets.get(key)
+        if bucket is not None:
+            start = time.monotonic()
+            await bucket.acquire_async()
+            self.waited += time.monotonic() - start
+
+    async def before_llm(self) -> None:
+        await self._take("anthropic")
+
+    async def before_tool(self, tool_name: str) -> None:
+        pass
+
+
+def make_buckets(ctx=multiprocessing) -> dict:
+    """Fleet-wide buckets: one per Purple Flea host plus one for Anthropic."""
+    host_rps = float(os.environ.get("PURPLEFLEA_FLEET_RPS", "20"))
+    llm_rps = float(os.environ.get("ANTHROPIC_FLEET_RPS", "5"))
+    buckets = {product: SharedTokenBucket(host_rps, ctx=ctx) for product in PRODUCTS}
+    buckets["anthropic"] = SharedTokenBucket(llm_rps, ctx=ctx)
+    return buckets
+
+
+# --- Worker process -----------------------------------------------------------
+
+_worker_buckets = None
+_worker_queue = None
+
+
+def _init_worker(buckets: dict, queue) -> None:
+    global _worker_buckets, _worker_queue
+    _worker_buckets = buckets
+    _worker_queue = queue
+
+
+def _run_worker(agents_per_process: int) -> list:
+    """Run agents that take (index, task) pairs off the shared queue until a None; one record per task."""
+    # Imported here so the parent process never builds clients of its own
+    from async_agent import run_money_stack_agent_async
+    from clients import BASE_URLS
+    from transport import add_shared_limiter
+
+    for product in PRODUCTS:
+        add_shared_limiter(BASE_URLS[product], _worker_buckets[product])
+    limiter = FleetRateLimiter(_worker_buckets)
+
+    async def agent() -> list:
+        records = []
+        while (item := await asyncio.to_thread(_worker_queue.get)) is not None:
+            index, task = item
+            start = time.perf_counter()
+            try:
+                await run_money_stack_agent_async(task, session=f"task-{index}", limiter=limiter)
+                error = None
+            except Exception as e:
+                error = f"{type(e).__name__}: {e}"
+            records.append({"index": index, "task": task, "latency": time.perf_counter() - start,
+                            "error": error, "pid": os.getpid()})
+        return records
+
+    async def run_all() -> list:
+        per_agent = await asyncio.gather(*(agent() for _ in range(agents_per_process)))
+        return [record for records in per_agent for record in records]
+
+    return asyncio.run(run_all())
+
+
+# --- Parent -------------------------------------------------------------------
+
+def percentile(values: list, pct: float) -> float:
+    """Nearest-rank percentile of values (0 for an empty list)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered) + 0.5) - 1))
+    return ordered[rank]
+
+
+def run_fleet(tasks: list[str], processes: int = None, agents_per_process: int = 8) -> dict:
+    """Run every task across the fleet and return the aggregated report."""
+    processes = processes or os.cpu_count() or 1
+    ctx = multiprocessing.get_context("spawn")
+    buckets = make_buckets(ctx)
+    queue = ctx.Queue()
+    for item in enumerate(tasks):
+        queue.put(item)
+    for _ in range(processes * agents_per_process):
+        queue.put(None)  # one stop marker per agent
+
+    records = []
+    start = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=processes, mp_context=ctx,
+                             initializer=_init_worker, initargs=(buckets, queue)) as pool:
+        futures = [pool.submit(_run_worker, agents_per_process) for _ in range(processes)]
+        for future in as_completed(futures):
+            records.extend(future.result())
+    wall = time.perf_counter() - start
+
+    latencies = [r["latency"] for r in records]
+    failed = [r for r in records if r["error"]]
+    return {
+        "tasks": len(records),
+        "failed": len(failed),
+        "processes": processes,
+        "agents_per_process": agents_per_process,
+        "wall_seconds": wall,
+        "throughput_per_min": len(records) / wall * 60 if wall else 0.0,
+        "latency_p50": percentile(latencies, 50),
+        "latency_p95": percentile(latencies, 95),
+        "latency_p99": percentile(latencies, 99),
+        "latency_max": max(latencies, default=0.0),
+        "errors": [{"task": r["task"], "error": r["error"]} for r in failed],
+    }
+
+
+def print_report(report: dict) -> None:
+    print(f"\n{'='*60}")
+    print(f"Fleet report — {report['processes']} processes × {report['agents_per_process']} agents")
+    print(f"{'='*60}")
+    print(f"  Tasks: {report['tasks']} ({report['failed']} failed)")
+    print(f"  Wall time: {report['wall_seconds']:.1f}s | Throughput: {report['throughput_per_min']:.1f} tasks/min")
+    print(f"  Latency p50 {report['latency_p50']:.1f}s | p95 {report['latency_p95']:.1f}s | "
+          f"p99 {report['latency_p99']:.1f}s | max {report['latency_max']:.1f}s")
+    for error in report["errors"][:10]:
+        print(f"  ✗ {error['task'][:50]}: {error['error']}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run a queue of Money Stack agent tasks across a process fleet")
+    parser.add_argument("tasks_file", help="File with one task per line")
+    parser.add_argument("--processes", type=int, default=None)
+    parser.add_argument("--agents", type=int, default=8, help="Concurrent agents per process")
+    args = parser.parse_args()
+
+    with open(args.tasks_file) as f:
+        tasks = [line.strip() for line in f if line.strip()]
+    print_report(run_fleet(tasks, processes=args.processes, agents_per_process=args.agents))
@@ -19,181 +19,373 @@ API docs:
   Domains: https://domains.purpleflea.com/docs
 """
 
+import itertools
+import json
 import os
-import anthropic
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as ToolTimeout
 from dotenv import load_dotenv
-from purpleflea import WalletClient, TradingClient, CasinoClient, DomainsClient
+
+from clients import lazy_client
+from compaction import compact_messages
+from domain_search import bulk_search
+from lazy import Lazy
+from ledger import ledger
+from prompt_cache import CacheStats, cached_system, cached_tools, with_cache_breakpoint
+import tracing
+from market_cache import MarketCache, freshness
+from risk import RiskEngine, RiskRejection
+from tool_registry import TOOL_REGISTRY, tool
 
 load_dotenv()
 
-REFERRAL_CODE = os.environ.get("PURPLEFLEA_REFERRAL_CODE", "STARTER")
-
-wallet_client = WalletClient(
-    api_key=os.environ["PURPLEFLEA_API_KEY"],
-    referral_code=REFERRAL_CODE,
-    base_url=os.environ.get("PURPLEFLEA_WALLET_API", "https://wallet.purpleflea.com/api/v1"),
-)
-trading_client = TradingClient(
-    api_key=os.environ["PURPLEFLEA_API_KEY"],
-    referral_code=REFERRAL_CODE,
-    base_url=os.environ.get("PURPLEFLEA_TRADING_API", "https://trading.purpleflea.com/api/v1"),
-)
-casino_client = CasinoClient(
-    api_key=os.environ["PURPLEFLEA_API_KEY"],
-    referral_code=REFERRAL_CODE,
-    base_url=os.environ.get("PURPLEFLEA_CASINO_API", "https://casino.purpleflea.com/api/v1"),
-)
-domains_client = DomainsClient(
-    api_key=os.environ["PURPLEFLEA_API_KEY"],
-    referral_code=REFERRAL_CODE,
-    base_url=os.environ.get("PURPLEFLEA_DOMAINS_API", "https://domains.purpleflea.com/api/v1"),
-)
-
-anthropic_client = anthropic.Anthropic(api_key=os.environ.get("ANTHROPIC_API_KEY"))
-
-# Tool definitions for Claude
-TOOLS = [
-    {
-        "name": "create_wallet",
-        "description": "Create a new multi-chain crypto wallet for the agent",
-        "input_schema": {
-            "type": "object",
-            "properties": {
-                "name": {"type": "string", "description": "Name for the wallet"},
-                "chains": {"type": "array", "items": {"type": "string"}, "description": "Blockchain networks"},
-            },
-            "required": ["name"],
-        },
-    },
-    {
-        "name": "get_wallet_balance",
-        "description": "Get crypto balances for a wallet",
-        "input_schema": {
-            "type": "object",
-            "properties": {
-                "wallet_id": {"type": "string", "description": "Wallet ID"},
-            },
-            "required": ["wallet_id"],
-        },
-    },
-    {
-        "name": "get_market_price",
-        "description": "Get current price for a trading market (BTC-PERP, ETH-PERP, TSLA-PERP, etc.)",
-        "input_schema": {
-            "type": "object",
-            "properties": {
-                "symbol": {"type": "string", "description": "Market symbol"},
-            },
-            "required": ["symbol"],
-        },
-    },
-    {
-        "name": "place_trade",
-        "description": "Place a market order to buy or sell",
-        "input_schema": {
-            "type": "object",
-            "properties": {
-                "symbol": {"type": "string", "description": "Market symbol"},
-                "side": {"type": "string", "enum": ["buy", "sell"]},
-                "size_usd": {"type": "number", "description": "Position size in USD"},
-            },
-            "required": ["symbol", "side", "size_usd"],
-        },
-    },
-    {
-        "name": "search_domains",
-        "description": "Search for available domain names",
-        "input_schema": {
-            "type": "object",
-            "properties": {
-                "name": {"type": "string", "description": "Domain name to search (without TLD)"},
-            },
-            "required": ["name"],
-        },
-    },
-    {
-        "name": "register_domain",
-        "description": "Register an available domain name",
-        "input_schema": {
-            "type": "object",
-            "properties": {
-                "domain": {"type": "string", "description": "Full domain name to register"},
-            },
-            "required": ["domain"],
-        },
-    },
-    {
-        "name": "play_dice",
-        "description": "Play a provably fair dice game",
-        "input_schema": {
-            "type": "object",
-            "properties": {
-                "bet_amount": {"type": "number", "description": "Bet amount in USD"},
-                "target": {"type": "integer", "minimum": 1, "maximum": 99, "description": "Roll target (1-99)"},
-                "over": {"type": "boolean", "description": "Bet on roll over (true) or under (false) target"},
-            },
-            "required": ["bet_amount", "target", "over"],
-        },
-    },
-]
+# All four clients share one pooled, keep-alive HTTP session (see clients.py).
+# Each is built on its first call, so a task that only trades builds one.
+wallet_client = lazy_client("WalletClient", "wallet")
+trading_client = lazy_client("TradingClient", "trading")
+casino_client = lazy_client("CasinoClient", "casino")
+domains_client = lazy_client("DomainsClient", "domains")
+
+market_cache = MarketCache(trading_client)
+risk = RiskEngine(trading_client)
+
+
+def _make_anthropic_client():
+    import anthropic  # deferred: the SDK is slow to import
+
+    return anthropic.Anthropic(api_key=os.environ.get("ANTHROPIC_API_KEY"))
+
+
+anthropic_client = Lazy(_make_anthropic_client)
+
+# Concurrent tool execution: cap on tool calls in flight per turn, and how long
+# a single call may run before its result is reported as a timeout.
+MAX_PARALLEL_TOOLS = int(os.environ.get("PURPLEFLEA_MAX_PARALLEL_TOOLS", "4"))
+TOOL_TIMEOUT_SECONDS = float(os.environ.get("PURPLEFLEA_TOOL_TIMEOUT", "20"))
+
+MODEL = "claude-opus-4-6"
+
+SYSTEM_PROMPT = """You are an autonomous AI agent with access to the Purple Flea Money Stack:
+- Wallet API (https://wallet.purpleflea.com): Create wallets, check balances, send crypto
+- Trading API (https://trading.purpleflea.com): Trade 275+ markets including BTC, ETH, TSLA, NVDA, GOLD
+- Casino API (https://casino.purpleflea.com): Play provably fair games
+- Domains API (https://domains.purpleflea.com): Register and manage domain names
+
+Your referral code is STARTER — always use it. All APIs are JSON-only and agent-native.
+Complete the user's task autonomously using the available tools."""
+
+# Tools for Claude. Each handler's schema, validator and product come from its
+# signature and @tool arguments (see tool_registry.py).
+
+@tool("wallet", idempotent=False, params={"name": "Name for the wallet", "chains": "Blockchain networks"})
+def create_wallet(name: str, chains: list[str] = None) -> str:
+    """Create a new multi-chain crypto wallet for the agent"""
+    wallet = wallet_client.wallets.create(name=name, chains=chains or ["ethereum", "base"])
+    ledger.record("wallet", "create", subject=wallet.id, name=name)
+    return f"Wallet created: id={wallet.id}, addresses={wallet.addresses}"
+
+
+@tool("wallet", params={"wallet_id": "Wallet ID"})
+def get_wallet_balance(wallet_id: str) -> str:
+    """Get crypto balances for a wallet"""
+    balances = wallet_client.wallets.get_balances(wallet_id)
+    return f"Balances: {balances}"
+
+
+@tool("trading", hidden=True)
+def get_market_price(symbol: str) -> str:
+    """Single-symbol price lookup, kept for older transcripts; get_market_prices replaces it."""
+    market, age = market_cache.get(symbol, fields=("price", "change_24h"))
+    tracing.current_span().set(cache_hits=int(age is not None), cache_misses=int(age is None))
+    return f"{market.symbol}: ${market.price:,.2f} | 24h: {market.change_24h:+.2f}%{freshness(age)}"
+
+
+@tool("trading", params={"symbols": "Market symbols"})
+def get_market_prices(symbols: list[str]) -> str:
+    """
+    Get current prices for one or more trading markets (BTC-PERP, ETH-PERP, TSLA-PERP, etc.)
+    in a single call. Ask for every symbol you need at once.
+    """
+    quotes = market_cache.get_many(symbols, fields=("price", "change_24h"))
+    hits = sum(age is not None for _, age in quotes.values())
+    tracing.current_span().set(cache_hits=hits, cache_misses=len(quotes) - hits)
+    rows = ["symbol | price | 24h"]
+    for symbol, (market, age) in quotes.items():
+        if isinstance(market, Exception):
+            rows.append(f"{symbol} | Error: {market}")
+        else:
+            rows.append(f"{market.symbol} | ${market.price:,.2f} | {market.change_24h:+.2f}%{freshness(age)}")
+    return "\n".join(rows)
+
+
+@tool("trading", idempotent=False, params={
+    "symbol": "Market symbol",
+    "side": {"enum": ["buy", "sell"]},
+    "size_usd": "Position size in USD",
+})
+def place_trade(symbol: str, side: str, size_usd: float) -> str:
+    """Place a market order to buy or sell"""
+    try:
+        with risk.order(symbol, side, size_usd):
+            order = trading_client.orders.create(symbol=symbol, side=side, type="market", size_usd=size_usd)
+    except RiskRejection as e:
+        # Answered locally with the limit that was hit, so the model can resize in its next turn
+        tracing.current_span().set(risk_rejected=e.code)
+        ledger.record("trading", "rejected", subject=symbol, amount=size_usd, side=side, type="market",
+                      reason=e.to_dict())
+        return f"Order rejected by risk check: {json.dumps(e.to_dict())}"
+    ledger.record("trading", "order", subject=order.symbol, amount=size_usd,
+                  side=order.side, type="market", fill_price=order.fill_price, order_id=order.id)
+    return f"Order executed: {order.side} {order.symbol} ${size_usd} @ ${order.fill_price:,.2f}"
+
+
+@tool("domains", params={
+    "name": "Domain name to search (without TLD)",
+    "names": "Candidate names to search (without TLD), best first",
+    "limit": "Max available domains to return (default 5)",
+})
+def search_domains(name: str = None, names: list[str] = None, limit: int = 5) -> str:
+    """Search for available domain names. Pass several candidate names at once to check them in bulk."""
+    names = names or ([name] if name else [])
+    if not names:
+        return "Error: give a name or a list of names to search"
+    available = [r["domain"] for r in itertools.islice(bulk_search(domains_client, names), limit)]
+    return f"Available: {available}"
+
+
+@tool("domains", idempotent=False, params={"domain": "Full domain name to register"})
+def register_domain(domain: str) -> str:
+    """Register an available domain name"""
+    reg = domains_client.domains.register(domain=domain)
+    ledger.record("domains", "register", subject=reg.domain, expires_at=reg.expires_at)
+    return f"Registered {reg.domain}, expires {reg.expires_at}"
+
+
+@tool("casino", idempotent=False, params={
+    "bet_amount": "Bet amount in USD",
+    "target": {"minimum": 1, "maximum": 99, "description": "Roll target (1-99)"},
+    "over": "Bet on roll over (true) or under (false) target",
+})
+def play_dice(bet_amount: float, target: int, over: bool) -> str:
+    """Play a provably fair dice game"""
+    result = casino_client.games.play(game="dice", bet_amount=bet_amount, options={"target": target, "over": over})
+    ledger.record("casino", "bet", subject="dice", amount=bet_amount,
+                  pnl=result.payout - bet_amount if result.won else -bet_amount,
+                  roll=result.roll, won=result.won)
+    outcome = f"{'WIN +$' + str(round(result.payout - bet_amount, 2)) if result.won else 'LOSS'}"
+    return f"Dice roll: {result.roll} | {outcome}"
+
+
+# Tools from other modules (PURPLEFLEA_TOOL_MODULES / "purpleflea.tools" entry points)
+TOOL_REGISTRY.load_plugins()
+
+TOOLS = TOOL_REGISTRY.schemas()
+
+# Which Purple Flea product (and so which API host) each tool calls
+TOOL_PRODUCTS = TOOL_REGISTRY.products()
+
+# Built once so the cached request prefix is byte-identical on every turn
+CACHED_SYSTEM = cached_system(SYSTEM_PROMPT)
+CACHED_TOOLS = cached_tools(TOOLS)
 
 
 def execute_tool(tool_name: str, tool_input: dict) -> str:
     """Execute a Purple Flea tool and return the result as a string."""
+    with tracing.span("tool", tool_name) as span:
+        try:
+            result = TOOL_REGISTRY.dispatch(tool_name, tool_input)
+        except Exception as e:
+            span.fail(e)
+            result = f"Error: {e}"
+        if span:
+            span.set(input_bytes=len(json.dumps(tool_input, default=str)), result_chars=len(result))
+        return result
+
+
+def timeout_result(tool_name: str) -> str:
+    """Result for a call abandoned at TOOL_TIMEOUT_SECONDS; it may still complete in the background."""
+    entry = TOOL_REGISTRY.get(tool_name)
+    if entry is not None and not entry.idempotent:
+        return (f"Error: no result after {TOOL_TIMEOUT_SECONDS:g}s, so the outcome is unknown and the call may "
+                f"still go through. Do not retry {tool_name}; check the wallet, positions or domains first.")
+    return f"Error: timed out after {TOOL_TIMEOUT_SECONDS:g}s"
+
+
+class _ToolSlots:
+    """
+    Caps the tool calls running at once at MAX_PARALLEL_TOOLS. A call abandoned
+    at its timeout hands its slot back right away, so it can't starve the calls
+    queued behind it while its thread finishes in the background.
+    """
+
+    def __init__(self, limit: int = MAX_PARALLEL_TOOLS):
+        self._free = threading.Semaphore(limit)
+        self._held = set()
+        self._lock = threading.Lock()
+
+    def acquire(self, index: int) -> None:
+        self._free.acquire()
+        with self._lock:
+            self._held.add(index)
+
+    def release(self, index: int) -> None:
+        """Give back index's slot; only the first of finish / abandon does anything."""
+        with self._lock:
+            if index not in self._held:
+                return
+            self._held.remove(index)
+        self._free.release()
+
+
+# Threads per turn are started lazily, one per call up to this; _ToolSlots does the capping
+MAX_TOOL_THREADS = 64
+
+
+def _timed_tool(slots: _ToolSlots, started: list, index: int, tool_name: str, tool_input: dict) -> str:
+    slots.acquire(index)
     try:
-        if tool_name == "create_wallet":
-            wallet = wallet_client.wallets.create(
-                name=tool_input["name"],
-                chains=tool_input.get("chains", ["ethereum", "base"]),
-            )
-            return f"Wallet created: id={wallet.id}, addresses={wallet.addresses}"
-
-        elif tool_name == "get_wallet_balance":
-            balances = wallet_client.wallets.get_balances(tool_input["wallet_id"])
-            return f"Balances: {balances}"
-
-        elif tool_name == "get_market_price":
-            market = trading_client.markets.get(tool_input["symbol"])
-            return f"{market.symbol}: ${market.price:,.2f} | 24h: {market.change_24h:+.2f}%"
-
-        elif tool_name == "place_trade":
-            order = trading_client.orders.create(
-                symbol=tool_input["symbol"],
-                side=tool_input["side"],
-                type="market",
-                size_usd=tool_input["size_usd"],
-            )
-            return f"Order executed: {order.side} {order.symbol} ${tool_input['size_usd']} @ ${order.fill_price:,.2f}"
-
-        elif tool_name == "search_domains":
-            results = domains_client.domains.search(name=tool_input["name"])
-            available = [r["domain"] for r in results if r["available"]]
-            return f"Available: {available[:5]}"
-
-        elif tool_name == "register_domain":
-            reg = domains_client.domains.register(domain=tool_input["domain"])
-            return f"Registered {reg.domain}, expires {reg.expires_at}"
-
-        elif tool_name == "play_dice":
-            result = casino_client.games.play(
-                game="dice",
-                bet_amount=tool_input["bet_amount"],
-                options={"target": tool_input["target"], "over": tool_input["over"]},
-            )
-            outcome = f"{'WIN +$' + str(round(result.payout - tool_input['bet_amount'], 2)) if result.won else 'LOSS'}"
-            return f"Dice roll: {result.roll} | {outcome}"
+        started[index] = time.monotonic()
+        return execute_tool(tool_name, tool_input)
+    finally:
+        slots.release(index)
 
-        else:
-            return f"Unknown tool: {tool_name}"
 
-    except Exception as e:
-        return f"Error: {e}"
+def _await_tool(future, slots: _ToolSlots, started: list, index: int, tool_name: str) -> str:
+    """Wait for one pooled call, allowing TOOL_TIMEOUT_SECONDS once it holds a slot."""
+    while True:
+        begun = started[index]
+        try:
+            if begun is None:
+                return future.result(timeout=0.05)  # queued for a slot; look again shortly
+            return future.result(timeout=max(begun + TOOL_TIMEOUT_SECONDS - time.monotonic(), 0))
+        except ToolTimeout:
+            if begun is not None:
+                slots.release(index)
+                return timeout_result(tool_name)
+
+
+def execute_tools(tool_blocks: list, parallel: bool = True) -> list[dict]:
+    """
+    Run the tool_use blocks of one turn and return their tool_result blocks.
+
+    With parallel=True at most MAX_PARALLEL_TOOLS calls run at once. Results
+    keep the order of tool_blocks, and a call that runs past
+    TOOL_TIMEOUT_SECONDS is reported as an error instead of holding up the rest
+    of the turn (as "outcome unknown, do not retry" for non-idempotent tools).
+    """
+    for block in tool_blocks:
+        print(f"  → Using tool: {block.name}({block.input})")
+
+    if not parallel or len(tool_blocks) < 2:
+        results = [execute_tool(block.name, block.input) for block in tool_blocks]
+    else:
+        started = [None] * len(tool_blocks)
+        slots = _ToolSlots()
+        # Not used as a context manager: exiting one would wait for timed-out calls
+        pool = ThreadPoolExecutor(max_workers=min(MAX_TOOL_THREADS, len(tool_blocks)))
+        try:
+            run_tool = tracing.wrap(_timed_tool)
+            futures = [
+                pool.submit(run_tool, slots, started, i, block.name, block.input)
+                for i, block in enumerate(tool_blocks)
+            ]
+            results = [_await_tool(future, slots, started, i, block.name)
+                       for i, (future, block) in enumerate(zip(futures, tool_blocks))]
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    return _tool_result_blocks(tool_blocks, results)
+
+
+def _tool_result_blocks(tool_blocks: list, results: list) -> list[dict]:
+    tool_results = []
+    for block, result in zip(tool_blocks, results):
+        print(f"  ← Result: {result}")
+        tool_results.append({
+            "type": "tool_result",
+            "tool_use_id": block.id,
+            "content": result,
+        })
+    return tool_results
+
+
+def stream_turn(request: dict, parallel: bool = True) -> tuple:
+    """
+    Run one model turn with the streaming Messages API.
 
+    Text is printed as it arrives, and each tool call is started (at most
+    MAX_PARALLEL_TOOLS running at once, or one at a time in block order with
+    parallel=False) as soon as its input JSON is complete, while the model is
+    still generating later blocks. Returns (response, tool_results)
+    with a tool_result for every tool_use block, in block order. A block whose
+    input JSON was cut off (e.g. at max_tokens) is not run, and its result says so.
 
-def run_money_stack_agent(task: str) -> str:
+    The llm span ends with the final message; waiting for tools that are still
+    running happens after it, so model latency doesn't absorb tool time.
+    """
+    started, futures, names = [], [], []
+    dispatched = {}  # content block index -> position in futures
+    slots = _ToolSlots()
+    run_tool = tracing.wrap(_timed_tool)  # tool spans belong to the caller's span, not the llm span
+    pending = {}  # content block index -> (tool name, input JSON fragments)
+    pool = ThreadPoolExecutor(max_workers=MAX_TOOL_THREADS if parallel else 1)  # one worker runs them in order
+    try:
+        with tracing.span("llm", MODEL, stream=True) as span, anthropic_client.messages.stream(**request) as stream:
+            for event in stream:
+                if event.type == "content_block_start":
+                    if event.content_block.type == "text":
+                        print("Agent: ", end="", flush=True)
+                    elif event.content_block.type == "tool_use":
+                        pending[event.index] = (event.content_block.name, [])
+
+                elif event.type == "content_block_delta":
+                    if event.delta.type == "text_delta":
+                        print(event.delta.text, end="", flush=True)
+                    elif event.delta.type == "input_json_delta":
+                        pending[event.index][1].append(event.delta.partial_json)
+
+                elif event.type == "content_block_stop":
+                    if event.index not in pending:
+                        print()
+                        continue
+                    tool_name, fragments = pending.pop(event.index)
+                    try:
+                        tool_input = json.loads("".join(fragments) or "{}")
+                    except json.JSONDecodeError:
+                        print(f"  ✗ {tool_name}: input was cut off, not running it")
+                        continue
+                    print(f"  → Using tool: {tool_name}({tool_input})")
+                    dispatched[event.index] = len(futures)
+                    started.append(None)
+                    names.append(tool_name)
+                    futures.append(pool.submit(run_tool, slots, started, len(started) - 1, tool_name, tool_input))
+
+            response = stream.get_final_message()
+            if span:
+                span.set(**tracing.usage_attrs(response.usage), stop_reason=response.stop_reason)
+
+        tool_blocks, results = [], []
+        for index, block in enumerate(response.content):
+            if block.type != "tool_use":
+                continue
+            tool_blocks.append(block)
+            i = dispatched.get(index)
+            results.append("Error: the tool input was cut off before it was complete, so the call was not run."
+                           if i is None else _await_tool(futures[i], slots, started, i, names[i]))
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    return response, _tool_result_blocks(tool_blocks, results)
+
+
+def run_money_stack_agent(task: str, parallel_tools: bool = True, stream: bool = False) -> str:
     """
     Run the full Money Stack agent with Claude as the brain.
     The agent autonomously uses all four Purple Flea APIs.
+    Independent tool calls within a turn run concurrently unless parallel_tools=False.
+    With stream=True, responses are streamed and tools start before the turn
+    finishes; parallel_tools=False still runs them one at a time, in block order.
     """
     print(f"\n{'='*60}")
     print(f"AI Agent Money Stack — ref: STARTER")
@@ -201,50 +393,65 @@ def run_money_stack_agent(task: str) -> str:
     print(f"{'='*60}\n")
 
     messages = [{"role": "user", "content": task}]
-    system_prompt = """You are an autonomous AI agent with access to the Purple Flea Money Stack:
-- Wallet API (https://wallet.purpleflea.com): Create wallets, check balances, send crypto
-- Trading API (https://trading.purpleflea.com): Trade 275+ markets including BTC, ETH, TSLA, NVDA, GOLD
-- Casino API (https://casino.purpleflea.com): Play provably fair games
-- Domains API (https://domains.purpleflea.com): Register and manage domain names
 
-Your referral code is STARTER — always use it. All APIs are JSON-only and agent-native.
-Complete the user's task autonomously using the available tools."""
+    tokens_saved = 0
+    cache_stats = CacheStats()
 
     while True:
-        response = anthropic_client.messages.create(
-            model="claude-opus-4-6",
+        # messages keeps the full history; only a compacted copy is sent
+        request_messages, compaction = compact_messages(messages)
+        if compaction["tokens_saved"]:
+            tokens_saved += compaction["tokens_saved"]
+            print(f"  ⋯ History compacted: ~{compaction['tokens_before']:,} → "
+                  f"~{compaction['tokens_after']:,} tokens (saved ~{compaction['tokens_saved']:,})")
+
+        request = dict(
+            model=MODEL,
             max_tokens=4096,
-            system=system_prompt,
-            tools=TOOLS,
-            messages=messages,
+            system=CACHED_SYSTEM,
+            tools=CACHED_TOOLS,
+            messages=with_cache_breakpoint(request_messages),
         )
 
-        # Print any text blocks
-        for block in response.content:
-            if hasattr(block, "text"):
-                print(f"Agent: {block.text}")
-
-        if response.stop_reason == "end_turn":
-            break
-
-        if response.stop_reason == "tool_use":
-            tool_results = []
-            for block in response.content:
-                if block.type == "tool_use":
-                    print(f"  → Using tool: {block.name}({block.input})")
-                    result = execute_tool(block.name, block.input)
-                    print(f"  ← Result: {result}")
-                    tool_results.append({
-                        "type": "tool_result",
-                        "tool_use_id": block.id,
-                        "content": result,
-                    })
-
-            messages.append({"role": "assistant", "content": response.content})
-            messages.append({"role": "user", "content": tool_results})
-        else:
-            break
+        # One turn span per model call, parent of its llm span and of the tool spans
+        with tracing.span("turn", MODEL, stream=stream):
+            if stream:
+                response, tool_results = stream_turn(request, parallel=parallel_tools)
+            else:
+                with tracing.span("llm", MODEL, stream=False) as span:
+                    response = anthropic_client.messages.create(**request)
+                    if span:
+                        span.set(**tracing.usage_attrs(response.usage), stop_reason=response.stop_reason)
+
+                # Print any text blocks
+                for block in response.content:
+                    if hasattr(block, "text"):
+                        print(f"Agent: {block.text}")
+
+            turn = cache_stats.record(response.usage)
+            print(f"  ⋯ Prompt cache: {turn['cache_read']:,} read / {turn['cache_write']:,} written "
+                  f"({turn['hit_rate']:.0%} hit)")
+
+            if stream and tool_results and response.stop_reason != "tool_use":
+                # Streamed tools start before the turn ends, so they have run even though the
+                # turn stopped early; send their results back instead of losing them
+                print(f"  ⋯ Turn stopped ({response.stop_reason}) with tool calls already started; "
+                      f"returning their results")
+            elif response.stop_reason != "tool_use":
+                break
+
+            if not stream:
+                tool_blocks = [block for block in response.content if block.type == "tool_use"]
+                tool_results = execute_tools(tool_blocks, parallel=parallel_tools)
+
+        messages.append({"role": "assistant", "content": response.content})
+        messages.append({"role": "user", "content": tool_results})
 
+    if tokens_saved:
+        print(f"\nHistory compaction saved ~{tokens_saved:,} prompt tokens in total")
+    print(f"Prompt cache: {cache_stats.summary()}")
+    if tracing.enabled():
+        tracing.HISTOGRAMS.print_summary()
     return "Task completed."
 
 
@@ -0,0 +1,34 @@
+"""
+Purple Flea Lazy Construction
+===============================
+A stand-in that builds its object on first use. Shared clients and the
+ledger are created this way, so importing an example costs nothing until it
+actually talks to an API or records something.
+
+    ledger = Lazy(lambda: Ledger(path))
+
+Standard library only, so any module can use it without importing clients
+(which needs PURPLEFLEA_API_KEY and requests).
+"""
+
+import threading
+
+
+class Lazy:
+    """Calls factory() on first attribute access, then forwards every attribute to its result."""
+
+    def __init__(self, factory):
+        self._factory = factory
+        self._target = None
+        self._lock = threading.Lock()
+
+    def resolve(self):
+        """The built object, building it if this is the first use."""
+        if self._target is None:
+            with self._lock:
+                if self._target is None:
+                    self._target = self._factory()
+        return self._target
+
+    def __getattr__(self, name: str):
+        return getattr(self.resolve(), name)
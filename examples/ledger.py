@@ -0,0 +1,180 @@
+"""
+Purple Flea Local Action Ledger
+=================================
+An append-only SQLite record of everything the agent does with money:
+wallet sends, orders, bets, domain registrations and renewals.
+
+P&L and audit questions are then answered locally instead of calling
+list_transactions, games.history or portfolio.get again:
+
+    from ledger import ledger
+    ledger.record("casino", "bet", subject="dice", amount=0.10, pnl=-0.10)
+    ledger.totals(product="casino", since=time.time() - 86400)
+    ledger.query(subject="BTC-PERP", limit=20)
+
+record() only appends to an in-memory buffer. Rows are written in one
+executemany() transaction once BATCH_SIZE rows are waiting, a query runs, or
+the process exits, and a background thread writes anything still buffered
+every FLUSH_SECONDS, so an idle agent doesn't keep rows only in memory.
+
+The database path comes from PURPLEFLEA_LEDGER_PATH (default purpleflea_ledger.db).
+It isn't opened at import: the shared ledger is built on first use.
+
+The ledger is an audit log, not the source of truth, and record() is called
+after the money has already moved, so it never raises. If the database can't
+be opened (a read-only filesystem) or a write fails (a full disk), the error
+goes to the "purpleflea.ledger" logger; rows that failed to write stay
+buffered and are retried on the next flush.
+"""
+
+import atexit
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+from lazy import Lazy
+
+logger = logging.getLogger("purpleflea.ledger")
+
+BATCH_SIZE = 200
+FLUSH_SECONDS = 2.0
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS actions (
+    id      INTEGER PRIMARY KEY,
+    ts      REAL NOT NULL,
+    product TEXT NOT NULL,   -- wallet | trading | casino | domains
+    action  TEXT NOT NULL,   -- send, order, bet, register, ...
+    subject TEXT,            -- symbol, domain, wallet id or game
+    amount  REAL,            -- USD or token amount moved
+    pnl     REAL,            -- realized profit/loss, when known
+    details TEXT             -- JSON
+);
+CREATE INDEX IF NOT EXISTS actions_product_ts ON actions (product, ts);
+CREATE INDEX IF NOT EXISTS actions_subject_ts ON actions (subject, ts);
+"""
+
+
+class Ledger:
+    """Buffered, append-only action log backed by SQLite."""
+
+    def __init__(self, path: str, batch_size: int = BATCH_SIZE, flush_seconds: float = FLUSH_SECONDS):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        self._buffer = []
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(SCHEMA)
+        self._stopped = threading.Event()
+        self._flusher = threading.Thread(target=self._flush_periodically, name="ledger-flush", daemon=True)
+        self._flusher.start()
+        atexit.register(self.close)
+
+    def _flush_periodically(self) -> None:
+        while not self._stopped.wait(self.flush_seconds):
+            if self._buffer:
+                self._flush_quietly()
+
+    def _flush_quietly(self) -> None:
+        try:
+            self.flush()
+        except Exception:
+            logger.exception("ledger flush failed; %d rows kept for the next attempt", len(self._buffer))
+
+    def close(self) -> None:
+        """Stop the background flusher and write what's left."""
+        self._stopped.set()
+        self._flush_quietly()
+
+    def record(self, product: str, action: str, subject: str = None,
+               amount: float = None, pnl: float = None, **details) -> None:
+        """Buffer one action; extra keyword arguments are stored as JSON details. Never raises."""
+        row = (time.time(), product, action, subject, amount, pnl,
+               json.dumps(details, default=str) if details else None)
+        with self._lock:
+            self._buffer.append(row)
+            due = len(self._buffer) >= self.batch_size
+        if due:
+            self._flush_quietly()
+
+    def flush(self) -> None:
+        """Write buffered rows in a single transaction; on failure they stay buffered and the error is raised."""
+        with self._lock:
+            rows, self._buffer = self._buffer, []
+            if rows:
+                try:
+                    with self._db:
+                        self._db.executemany(
+                            "INSERT INTO actions (ts, product, action, subject, amount, pnl, details) "
+                            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                            rows,
+                        )
+                except Exception:
+                    self._buffer[:0] = rows
+                    raise
+
+    def _where(self, product, action, subject, since, until) -> tuple:
+        clauses, params = [], []
+        for column, value in (("product", product), ("action", action), ("subject", subject)):
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        if since is not None:
+            clauses.append("ts >= ?")
+            params.append(since)
+        if until is not None:
+            clauses.append("ts < ?")
+            params.append(until)
+        return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+    def query(self, product: str = None, action: str = None, subject: str = None,
+              since: float = None, until: float = None, limit: int = None) -> list:
+        """Matching actions, newest first, as dicts."""
+        self.flush()
+        where, params = self._where(product, action, subject, since, until)
+        sql = f"SELECT ts, product, action, subject, amount, pnl, details FROM actions{where} ORDER BY ts DESC"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        with self._lock:
+            rows = self._db.execute(sql, params).fetchall()
+        return [
+            {"ts": ts, "product": product, "action": action, "subject": subject,
+             "amount": amount, "pnl": pnl, "details": json.loads(details) if details else {}}
+            for ts, product, action, subject, amount, pnl, details in rows
+        ]
+
+    def totals(self, product: str = None, action: str = None, subject: str = None,
+               since: float = None, until: float = None) -> dict:
+        """Count, amount and P&L sums per (product, action) over the matching actions."""
+        self.flush()
+        where, params = self._where(product, action, subject, since, until)
+        sql = (f"SELECT product, action, COUNT(*), TOTAL(amount), TOTAL(pnl) FROM actions{where} "
+               "GROUP BY product, action")
+        with self._lock:
+            rows = self._db.execute(sql, params).fetchall()
+        return {
+            (product, action): {"count": count, "amount": amount, "pnl": pnl}
+            for product, action, count, amount, pnl in rows
+        }
+
+
+class SharedLedger(Lazy):
+    """The process-wide Ledger, opened on first use; record() logs rather than raises if it can't be opened."""
+
+    def record(self, *args, **kwargs) -> None:
+        try:
+            ledger = self.resolve()
+        except Exception:
+            logger.exception("ledger unavailable; action not recorded: %r %r", args, kwargs)
+            return
+        ledger.record(*args, **kwargs)
+
+
+ledger = SharedLedger(lambda: Ledger(os.environ.get("PURPLEFLEA_LEDGER_PATH", "purpleflea_ledger.db")))
@@ -0,0 +1,158 @@
+"""
+Purple Flea Market Data Cache
+===============================
+Read-through cache for the Trading API's markets.get and markets.list.
+
+Agents ask for the same symbol several times in one conversation, so market
+data is kept for a short, per-field time-to-live: a price goes stale after
+a second, while a funding rate can be reused for a minute. A lookup asks for
+the fields it needs and is served from cache only if all of them are still
+fresh.
+
+Every lookup returns the age of the data (None when it was just fetched),
+so callers can tell the model how fresh a cached value is.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+# Seconds each market field stays fresh
+DEFAULT_FIELD_TTLS = {
+    "price": 1.0,
+    "change_24h": 5.0,
+    "volume_24h": 30.0,
+    "funding_rate": 60.0,
+}
+
+
+class MarketCache:
+    """
+    LRU + TTL cache in front of a TradingClient's markets API.
+
+        cache = MarketCache(client)
+        market, age = cache.get("BTC-PERP", fields=("price", "change_24h"))
+    """
+
+    def __init__(self, client, field_ttls: dict = None, max_symbols: int = 512, max_lists: int = 16):
+        self.client = client
+        self.field_ttls = {**DEFAULT_FIELD_TTLS, **(field_ttls or {})}
+        self.max_symbols = max_symbols
+        self.max_lists = max_lists
+        self.hits = 0
+        self.misses = 0
+        self._markets = OrderedDict()  # symbol -> (fetched_at, market)
+        self._lists = OrderedDict()  # sorted filter items -> (fetched_at, markets)
+        self._lock = threading.Lock()
+
+    def ttl(self, fields) -> float:
+        """How long data stays usable for a lookup that needs all of fields."""
+        return min(self.field_ttls.get(field, 0.0) for field in fields)
+
+    def get(self, symbol: str, fields=("price",)) -> tuple:
+        """Return (market, age_seconds) for symbol; age is None on a fresh fetch."""
+        return self._read(self._markets, symbol, self.max_symbols, fields,
+                          lambda: self.client.markets.get(symbol))
+
+    def get_many(self, symbols: list, fields=("price",), max_workers: int = 8) -> dict:
+        """
+        Return {symbol: (market, age_seconds)} for several symbols at once.
+
+        Fresh entries come from cache. Misses are fetched with a single
+        markets.get_many() call when the SDK has one, otherwise fetched
+        concurrently. A symbol whose fetch fails maps to (exception, None).
+        """
+        max_age = self.ttl(fields)
+        now = time.monotonic()
+        results, missing = {}, []
+        with self._lock:
+            for symbol in dict.fromkeys(symbols):
+                entry = self._markets.get(symbol)
+                if entry is not None and now - entry[0] < max_age:
+                    self._markets.move_to_end(symbol)
+                    self.hits += 1
+                    results[symbol] = (entry[1], now - entry[0])
+                else:
+                    self.misses += 1
+                    missing.append(symbol)
+
+        if not missing:
+            return results
+        if hasattr(self.client.markets, "get_many"):
+            try:
+                fetched = {m.symbol: m for m in self.client.markets.get_many(missing)}
+            except Exception as e:
+                fetched = {symbol: e for symbol in missing}
+        else:
+            def fetch(symbol):
+                try:
+                    return self.client.markets.get(symbol)
+                except Exception as e:
+                    return e
+
+            with ThreadPoolExecutor(max_workers=min(max_workers, len(missing))) as pool:
+                fetched = dict(zip(missing, pool.map(fetch, missing)))
+
+        with self._lock:
+            for symbol in missing:
+                value = fetched.get(symbol, LookupError(f"no market data for {symbol}"))
+                results[symbol] = (value, None)
+                if not isinstance(value, Exception):
+                    self._markets[symbol] = (time.monotonic(), value)
+                    self._markets.move_to_end(symbol)
+            while len(self._markets) > self.max_symbols:
+                self._markets.popitem(last=False)
+        return {symbol: results[symbol] for symbol in dict.fromkeys(symbols)}
+
+    def list(self, fields=("price", "change_24h", "volume_24h"), **filters) -> tuple:
+        """Return (markets, age_seconds) for markets.list(**filters); age is None on a fresh fetch."""
+        key = tuple(sorted(filters.items()))
+        return self._read(self._lists, key, self.max_lists, fields,
+                          lambda: self.client.markets.list(**filters))
+
+    def _read(self, entries: OrderedDict, key, capacity: int, fields, fetch) -> tuple:
+        max_age = self.ttl(fields)
+        now = time.monotonic()
+        with self._lock:
+            entry = entries.get(key)
+            if entry is not None and now - entry[0] < max_age:
+                entries.move_to_end(key)
+                self.hits += 1
+                return entry[1], now - entry[0]
+            self.misses += 1
+
+        # Fetch outside the lock so one slow symbol doesn't block the others
+        value = fetch()
+        with self._lock:
+            entries[key] = (time.monotonic(), value)
+            entries.move_to_end(key)
+            while len(entries) > capacity:
+                entries.popitem(last=False)
+        return value, None
+
+    def invalidate(self, symbol: str = None) -> None:
+        """Drop one symbol, or everything when symbol is None."""
+        with self._lock:
+            if symbol is None:
+                self._markets.clear()
+            else:
+                self._markets.pop(symbol, None)
+            self._lists.clear()
+
+    def stats(self) -> dict:
+        """Hit/miss counters and current size."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "symbols": len(self._markets),
+                "lists": len(self._lists),
+            }
+
+
+def freshness(age: float) -> str:
+    """Suffix telling the reader (or model) whether a value came from cache."""
+    return "" if age is None else f" (cached, {age:.1f}s old)"
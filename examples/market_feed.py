@@ -0,0 +1,144 @@
+"""
+Purple Flea Incremental Market Feed
+=====================================
+Keeps a local, always-current view of every market and answers "top movers"
+without re-downloading and re-sorting the whole market list.
+
+A source yields batches of deltas. A delta is a dict with a "symbol" and only
+the fields that changed, or {"symbol": ..., "removed": True}:
+
+    [{"symbol": "BTC-PERP", "price": 97012.5, "change_24h": 2.31}, ...]
+
+Sources:
+  stream_source   the Trading API's streaming endpoint, when the SDK has one
+  polling_source  polls markets.list and yields only what changed since the last poll
+  replay_source   replays batches recorded to a JSONL file (offline runs and tests)
+
+    feed = MarketFeed()
+    feed.start(default_source(client, stop=feed.stop_event))
+    feed.top_movers(10, min_volume=10_000_000)
+"""
+
+import heapq
+import json
+import threading
+import time
+
+
+class MarketFeed:
+    """In-memory market state maintained from delta batches."""
+
+    def __init__(self):
+        self.markets = {}  # symbol -> market dict
+        self.batches_applied = 0
+        self._lock = threading.Lock()
+        self.stop_event = threading.Event()
+        self._thread = None
+
+    def apply(self, deltas: list) -> None:
+        """Merge one batch of deltas into the local market state."""
+        with self._lock:
+            for delta in deltas:
+                symbol = delta["symbol"]
+                if delta.get("removed"):
+                    self.markets.pop(symbol, None)
+                else:
+                    self.markets.setdefault(symbol, {"symbol": symbol}).update(delta)
+            self.batches_applied += 1
+
+    def top_movers(self, n: int = 10, min_volume: float = 0) -> list:
+        """The n markets with the largest abs(change_24h), via a size-n heap rather than a full sort."""
+        with self._lock:
+            candidates = [
+                m for m in self.markets.values()
+                if "change_24h" in m and m.get("volume_24h", 0) >= min_volume
+            ]
+            return [dict(m) for m in heapq.nlargest(n, candidates, key=lambda m: abs(m["change_24h"]))]
+
+    def consume(self, source, max_batches: int = None) -> None:
+        """Apply batches from source on the calling thread until it ends, stop() or max_batches."""
+        for count, deltas in enumerate(source, start=1):
+            self.apply(deltas)
+            if self.stop_event.is_set() or (max_batches is not None and count >= max_batches):
+                break
+
+    def start(self, source) -> threading.Thread:
+        """Consume source on a background thread."""
+        self.stop_event.clear()
+        self._thread = threading.Thread(target=self.consume, args=(source,), name="market-feed", daemon=True)
+        self._thread.start()
+        return self._thread
+
+    def stop(self) -> None:
+        """Ask the background consumer to finish after its current batch."""
+        self.stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+
+def diff_markets(previous: dict, current: dict) -> list:
+    """Deltas that turn the previous snapshot into current (both keyed by symbol)."""
+    deltas = []
+    for symbol, market in current.items():
+        old = previous.get(symbol)
+        if old is None:
+            deltas.append(dict(market))
+            continue
+        changed = {k: v for k, v in market.items() if old.get(k) != v}
+        if changed:
+            deltas.append({"symbol": symbol, **changed})
+    deltas.extend({"symbol": symbol, "removed": True} for symbol in previous.keys() - current.keys())
+    return deltas
+
+
+def polling_source(client, interval: float = 5.0, min_volume: float = 0, stop: threading.Event = None):
+    """Poll markets.list every interval seconds and yield only the markets that changed."""
+    previous = {}
+    stop = stop or threading.Event()
+    while not stop.is_set():
+        current = {m["symbol"]: dict(m) for m in client.markets.list(min_volume=min_volume)}
+        deltas = diff_markets(previous, current)
+        previous = current
+        if deltas:
+            yield deltas
+        stop.wait(interval)
+
+
+def stream_source(client, min_volume: float = 0):
+    """Yield delta batches from the Trading API's markets stream."""
+    for message in client.markets.stream(min_volume=min_volume):
+        yield message if isinstance(message, list) else [message]
+
+
+def replay_source(path: str, speed: float = None):
+    """
+    Replay batches from a JSONL file, one batch per line, each {"t": seconds, "deltas": [...]}.
+    With speed set, sleeps to reproduce the recorded timing (2.0 = twice as fast).
+    """
+    last_t = None
+    with open(path) as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            if speed and last_t is not None:
+                time.sleep(max(record["t"] - last_t, 0) / speed)
+            last_t = record["t"]
+            yield record["deltas"]
+
+
+def record_source(source, path: str):
+    """Pass batches through from source while appending them to a JSONL file for replay_source."""
+    start = time.monotonic()
+    with open(path, "a") as f:
+        for deltas in source:
+            f.write(json.dumps({"t": round(time.monotonic() - start, 3), "deltas": deltas}) + "\n")
+            f.flush()
+            yield deltas
+
+
+def default_source(client, interval: float = 5.0, min_volume: float = 0, stop: threading.Event = None):
+    """The streaming endpoint if the SDK exposes one, otherwise diffed polling."""
+    if hasattr(client.markets, "stream"):
+        return stream_source(client, min_volume=min_volume)
+    return polling_source(client, interval=interval, min_volume=min_volume, stop=stop)
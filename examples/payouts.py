@@ -0,0 +1,202 @@
+"""
+Purple Flea Batch Payouts
+===========================
+Pays out many recipients from one wallet without strictly serial sends.
+
+    batch = PayoutBatch(client, wallet_id, entries, batch_id="rewards-2026-10-17")
+    batch.submit()                 # returns once every transfer is submitted
+    batch.track_confirmations()    # background thread polls until confirmed/failed
+    batch.wait(timeout=600)
+
+entries is a list of (to, amount, token, chain) tuples. Transfers are grouped
+by chain, and each chain is worked on concurrently:
+
+- Native batching: when the SDK has wallets.send_batch, each chain's
+  transfers go out as one multi-output / multicall transaction per BATCH_SIZE.
+- Nonce pipelining: on EVM chains, if the SDK exposes wallets.get_nonce,
+  nonces are assigned up front and transfers are submitted concurrently.
+  Otherwise they are submitted back to back, without waiting for confirmations.
+
+Every transfer has a deterministic idempotency key derived from the batch id
+and the transfer itself (not its position in entries), so a re-run with the
+entries reordered maps to the same keys. Keys and tx hashes are appended to
+payouts_<batch_id>.jsonl, one fsynced line per update, so re-running a batch
+after a crash only sends what was never submitted. The key is also passed to
+the API so it can deduplicate on its side: with each send, and with each
+transfer inside a native batch. Pending transfers are chunked in key order, so
+a re-run splits them into the same native batches whatever order entries are
+given in.
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+from ledger import ledger
+
+EVM_CHAINS = {"ethereum", "base"}
+BATCH_SIZE = 50
+FINAL_STATUSES = {"confirmed", "failed"}
+
+
+def payout_key(batch_id: str, entry: tuple, n: int = 0) -> str:
+    """
+    Deterministic idempotency key for one transfer of a batch.
+    n numbers repeats of the same (to, amount, token, chain) so identical entries stay distinct.
+    """
+    return hashlib.sha256(json.dumps([batch_id, *entry, n], default=str).encode()).hexdigest()[:32]
+
+
+def load_journal(path: str) -> dict:
+    """Fold a JSONL journal into {key: {"hash", "status"}}; later lines win, a torn last line is skipped."""
+    journal = {}
+    if os.path.exists(path):
+        with open(path) as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                journal[entry.pop("key")] = entry
+    return journal
+
+
+class PayoutBatch:
+    """A set of transfers submitted with bounded concurrency and tracked to confirmation."""
+
+    def __init__(self, client, wallet_id: str, entries: list, batch_id: str,
+                 journal_dir: str = ".", max_concurrency: int = 8):
+        self.client = client
+        self.wallet_id = wallet_id
+        self.batch_id = batch_id
+        self.max_concurrency = max_concurrency
+        self.transfers = {}
+        repeats = Counter()
+        for entry in map(tuple, entries):
+            self.transfers[payout_key(batch_id, entry, repeats[entry])] = dict(
+                zip(("to", "amount", "token", "chain"), entry))
+            repeats[entry] += 1
+        self.journal_path = os.path.join(journal_dir, f"payouts_{batch_id}.jsonl")
+        self.journal = load_journal(self.journal_path)  # key -> {"hash": ..., "status": ...}
+        self._lock = threading.Lock()
+        self._tracker = None
+
+    def _save(self, updates: dict) -> None:
+        """Append one journal line per key. O_APPEND keeps concurrent writes whole, so no lock is held for I/O."""
+        data = "".join(json.dumps({"key": key, **entry}) + "\n" for key, entry in updates.items()).encode()
+        fd = os.open(self.journal_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, data)
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+        with self._lock:
+            self.journal.update(updates)
+
+    def pending(self) -> dict:
+        """Transfers not yet submitted, grouped by chain and sorted by key."""
+        by_chain = defaultdict(list)
+        for key, transfer in sorted(self.transfers.items()):
+            if key not in self.journal:
+                by_chain[transfer["chain"]].append((key, transfer))
+        return by_chain
+
+    def submit(self) -> dict:
+        """Submit every unsent transfer; returns the journal (key -> hash/status)."""
+        by_chain = self.pending()
+        with ThreadPoolExecutor(max_workers=max(len(by_chain), 1)) as pool:
+            for future in [pool.submit(self._submit_chain, chain, items) for chain, items in by_chain.items()]:
+                future.result()
+        return dict(self.journal)
+
+    def _submit_chain(self, chain: str, items: list) -> None:
+        if hasattr(self.client.wallets, "send_batch"):
+            for start in range(0, len(items), BATCH_SIZE):
+                self._send_native_batch(chain, items[start:start + BATCH_SIZE])
+        elif chain in EVM_CHAINS and hasattr(self.client.wallets, "get_nonce"):
+            # A failed send leaves a nonce gap that holds up the ones after it until
+            # the batch is re-run, which fills it from the wallet's next nonce
+            first_nonce = self.client.wallets.get_nonce(self.wallet_id, chain=chain)
+            with ThreadPoolExecutor(max_workers=self.max_concurrency) as pool:
+                list(pool.map(lambda args: self._send_one(*args[1], nonce=first_nonce + args[0]), enumerate(items)))
+        elif chain in EVM_CHAINS:
+            # The wallet service assigns nonces itself; keep submissions in order
+            for item in items:
+                self._send_one(*item)
+        else:
+            with ThreadPoolExecutor(max_workers=self.max_concurrency) as pool:
+                list(pool.map(lambda item: self._send_one(*item), items))
+
+    def _send_one(self, key: str, transfer: dict, nonce: int = None) -> None:
+        kwargs = {"nonce": nonce} if nonce is not None else {}
+        try:
+            tx = self.client.wallets.send(wallet_id=self.wallet_id, idempotency_key=key, **transfer, **kwargs)
+        except Exception as e:
+            print(f"  ✗ {transfer['amount']} {transfer['token']} → {transfer['to']} ({transfer['chain']}): {e}")
+            return
+        self._save({key: {"hash": tx.hash, "status": tx.status}})
+        self._record(transfer, tx.hash)
+
+    def _record(self, transfer: dict, tx_hash: str) -> None:
+        ledger.record("wallet", "send", subject=self.wallet_id, amount=float(transfer["amount"]),
+                      token=transfer["token"], chain=transfer["chain"], to=transfer["to"],
+                      hash=tx_hash, batch_id=self.batch_id)
+
+    def _send_native_batch(self, chain: str, items: list) -> None:
+        batch_key = hashlib.sha256("".join(key for key, _ in items).encode()).hexdigest()[:32]
+        try:
+            tx = self.client.wallets.send_batch(
+                wallet_id=self.wallet_id,
+                chain=chain,
+                transfers=[
+                    {**{k: v for k, v in transfer.items() if k != "chain"}, "idempotency_key": key}
+                    for key, transfer in items
+                ],
+                idempotency_key=batch_key,
+            )
+        except Exception as e:
+            print(f"  ✗ batch of {len(items)} on {chain}: {e}")
+            return
+        self._save({key: {"hash": tx.hash, "status": tx.status} for key, _ in items})
+        for _, transfer in items:
+            self._record(transfer, tx.hash)
+
+    def track_confirmations(self, interval: float = 5.0) -> threading.Thread:
+        """Poll submitted transactions on a background thread until each is confirmed or failed."""
+        def poll():
+            while True:
+                with self._lock:
+                    open_hashes = {e["hash"] for e in self.journal.values() if e["status"] not in FINAL_STATUSES}
+                if not open_hashes:
+                    return
+                statuses = {}
+                for tx_hash in open_hashes:
+                    try:
+                        statuses[tx_hash] = self.client.wallets.get_transaction(self.wallet_id, tx_hash).status
+                    except Exception:
+                        continue  # try again next round
+                updates = {
+                    key: {**entry, "status": statuses[entry["hash"]]}
+                    for key, entry in list(self.journal.items())
+                    if statuses.get(entry["hash"], entry["status"]) != entry["status"]
+                }
+                if updates:
+                    self._save(updates)
+                time.sleep(interval)
+
+        self._tracker = threading.Thread(target=poll, name=f"payouts-{self.batch_id}", daemon=True)
+        self._tracker.start()
+        return self._tracker
+
+    def wait(self, timeout: float = None) -> dict:
+        """Wait for the confirmation tracker; returns a count of transfers per status."""
+        if self._tracker is not None:
+            self._tracker.join(timeout)
+        counts = defaultdict(int)
+        for key in self.transfers:
+            counts[self.journal.get(key, {}).get("status", "unsent")] += 1
+        return dict(counts)
@@ -0,0 +1,86 @@
+"""
+Purple Flea Prompt Caching Helpers
+====================================
+Builds agent-loop requests so Anthropic prompt caching hits reliably, and
+reports how often it does.
+
+Request layout (cache breakpoints marked *):
+
+    tools ......... frozen copy of TOOLS, breakpoint on the last tool *
+    system ........ SYSTEM_PROMPT as one text block *
+    messages ...... breakpoint on the newest block *
+
+tools and system are built once at import and never touched again, so their
+bytes are identical on every turn and across agents in the same process. The
+breakpoint on the newest message lets the next turn reuse the conversation
+so far whenever history compaction hasn't rewritten it.
+
+Prefixes shorter than the model's minimum cacheable length are not cached;
+the hit rate then simply reads 0%.
+"""
+
+import copy
+
+EPHEMERAL = {"type": "ephemeral"}
+
+
+def cached_system(prompt: str) -> list:
+    """The system prompt as a cacheable text block."""
+    return [{"type": "text", "text": prompt, "cache_control": dict(EPHEMERAL)}]
+
+
+def cached_tools(tools: list) -> list:
+    """A private copy of tools with a cache breakpoint on the last entry."""
+    frozen = copy.deepcopy(tools)
+    frozen[-1]["cache_control"] = dict(EPHEMERAL)
+    return frozen
+
+
+def with_cache_breakpoint(messages: list) -> list:
+    """Copy of messages with a cache breakpoint on the last block of the newest message."""
+    if not messages:
+        return messages
+    last = messages[-1]
+    content = last["content"]
+    if isinstance(content, str):
+        content = [{"type": "text", "text": content}]
+    if not content or not isinstance(content[-1], dict):
+        return messages
+    content = [*content[:-1], {**content[-1], "cache_control": dict(EPHEMERAL)}]
+    return [*messages[:-1], {**last, "content": content}]
+
+
+class CacheStats:
+    """Running prompt-cache totals from response.usage."""
+
+    def __init__(self):
+        self.cache_read = 0
+        self.cache_write = 0
+        self.uncached = 0
+
+    def record(self, usage) -> dict:
+        """Add one response's usage; returns this turn's numbers."""
+        turn = {
+            "cache_read": getattr(usage, "cache_read_input_tokens", 0) or 0,
+            "cache_write": getattr(usage, "cache_creation_input_tokens", 0) or 0,
+            "uncached": getattr(usage, "input_tokens", 0) or 0,
+        }
+        self.cache_read += turn["cache_read"]
+        self.cache_write += turn["cache_write"]
+        self.uncached += turn["uncached"]
+        turn["hit_rate"] = hit_rate(**turn)
+        return turn
+
+    @property
+    def hit_rate(self) -> float:
+        return hit_rate(self.cache_read, self.cache_write, self.uncached)
+
+    def summary(self) -> str:
+        return (f"{self.cache_read:,} read / {self.cache_write:,} written / "
+                f"{self.uncached:,} uncached ({self.hit_rate:.0%} hit)")
+
+
+def hit_rate(cache_read: int, cache_write: int, uncached: int) -> float:
+    """Share of input tokens served from the prompt cache."""
+    total = cache_read + cache_write + uncached
+    return cache_read / total if total else 0.0
@@ -0,0 +1,232 @@
+"""
+Purple Flea Pre-Trade Risk Checks
+===================================
+Checks every order against local limits before it is sent, so a bad order is
+refused in microseconds rather than after a round-trip to the Trading API and,
+for an LLM agent, without wasting a turn on the rejection.
+
+    risk = RiskEngine(client)
+    with risk.order("BTC-PERP", "buy", 250.0, leverage=2):
+        order = client.orders.create(...)
+
+order() checks the order and reserves its exposure under one lock, so
+concurrent tool calls can't each pass a check that together they would fail.
+The reservation becomes a position if the body succeeds and is released if it
+raises. A refused order raises RiskRejection, whose code and detail say which
+limit was hit and by how much (see to_dict()).
+
+The engine keeps its own view of the account: net notional per symbol (long
+positive, short negative), gross exposure and equity. It is loaded from
+portfolio.get and then updated incrementally from the engine's own fills, so a
+check never calls the API. Every resync_seconds the next check reloads it, to
+pick up fills, liquidations and closes made elsewhere. Limit orders are
+counted as filled until that resync, which is the conservative reading.
+
+Limits, from the environment (0 disables a limit):
+  PURPLEFLEA_RISK_MAX_ORDER_USD         largest single order (default 1000)
+  PURPLEFLEA_RISK_MAX_POSITION_USD      largest net position per symbol (default 2500)
+  PURPLEFLEA_RISK_MAX_GROSS_USD         largest total exposure (default 10000)
+  PURPLEFLEA_RISK_MAX_LEVERAGE          highest per-order leverage (default 5)
+  PURPLEFLEA_RISK_MAX_ACCOUNT_LEVERAGE  highest gross exposure / equity (default 3)
+  PURPLEFLEA_RISK_BLOCKED_SYMBOLS       comma-separated symbols never to trade
+"""
+
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+MAX_ORDER_USD = float(os.environ.get("PURPLEFLEA_RISK_MAX_ORDER_USD", "1000"))
+MAX_POSITION_USD = float(os.environ.get("PURPLEFLEA_RISK_MAX_POSITION_USD", "2500"))
+MAX_GROSS_USD = float(os.environ.get("PURPLEFLEA_RISK_MAX_GROSS_USD", "10000"))
+MAX_LEVERAGE = float(os.environ.get("PURPLEFLEA_RISK_MAX_LEVERAGE", "5"))
+MAX_ACCOUNT_LEVERAGE = float(os.environ.get("PURPLEFLEA_RISK_MAX_ACCOUNT_LEVERAGE", "3"))
+BLOCKED_SYMBOLS = frozenset(filter(None, (
+    s.strip() for s in os.environ.get("PURPLEFLEA_RISK_BLOCKED_SYMBOLS", "").split(",")
+)))
+
+_SIGN = {"buy": 1, "long": 1, "sell": -1, "short": -1}
+
+
+class RiskRejection(Exception):
+    """An order refused by a local risk check."""
+
+    def __init__(self, code: str, message: str, **detail):
+        super().__init__(message)
+        self.code = code
+        self.detail = detail
+
+    def to_dict(self) -> dict:
+        return {"code": self.code, "message": str(self), **self.detail}
+
+
+class RiskLimits:
+    """Order, position and exposure limits in USD; 0 or None disables one."""
+
+    def __init__(self, max_order_usd: float = MAX_ORDER_USD, max_position_usd: float = MAX_POSITION_USD,
+                 max_gross_usd: float = MAX_GROSS_USD, max_leverage: float = MAX_LEVERAGE,
+                 max_account_leverage: float = MAX_ACCOUNT_LEVERAGE, blocked_symbols=BLOCKED_SYMBOLS,
+                 allowed_symbols=None):
+        self.max_order_usd = max_order_usd
+        self.max_position_usd = max_position_usd
+        self.max_gross_usd = max_gross_usd
+        self.max_leverage = max_leverage
+        self.max_account_leverage = max_account_leverage
+        self.blocked_symbols = frozenset(blocked_symbols or ())
+        self.allowed_symbols = frozenset(allowed_symbols) if allowed_symbols else None
+
+
+class RiskEngine:
+    """Local account view plus the checks run against it before each order."""
+
+    def __init__(self, client, limits: RiskLimits = None, resync_seconds: float = 30.0):
+        self.client = client
+        self.limits = limits or RiskLimits()
+        self.resync_seconds = resync_seconds
+        self.positions = {}  # symbol -> signed net notional, fills and reservations included
+        self.gross = 0.0  # sum of abs(positions)
+        self.equity = None
+        self.synced_at = None
+        self.stats = {"checked": 0, "rejected": 0, "syncs": 0}
+        self._reserved = {}  # symbol -> signed notional of orders in flight
+        self._lock = threading.Lock()
+        self._sync_lock = threading.Lock()
+
+    # --- Account view -----------------------------------------------------------
+
+    def load(self, portfolio) -> None:
+        """Replace the view with a portfolio.get result; orders in flight stay reserved."""
+        positions = {}
+        for pos in portfolio.positions:
+            positions[pos["symbol"]] = positions.get(pos["symbol"], 0.0) + _SIGN[pos["side"]] * pos["size_usd"]
+        with self._lock:
+            for symbol, notional in self._reserved.items():
+                positions[symbol] = positions.get(symbol, 0.0) + notional
+            self.positions = positions
+            self.gross = sum(abs(n) for n in positions.values())
+            self.equity = portfolio.total_value
+            self.synced_at = time.monotonic()
+            self.stats["syncs"] += 1
+
+    def sync(self) -> None:
+        self.load(self.client.portfolio.get())
+
+    def invalidate(self) -> None:
+        """Reload on the next check, e.g. after closing a position."""
+        self.synced_at = None
+
+    def _ensure_fresh(self) -> None:
+        synced_at = self.synced_at
+        if synced_at is not None and time.monotonic() - synced_at < self.resync_seconds:
+            return
+        with self._sync_lock:  # one reload at a time; the others wait for it
+            if self.synced_at is synced_at:
+                self.sync()
+
+    def _apply(self, symbol: str, notional: float) -> None:
+        """Add signed notional to a symbol, keeping gross in step. Caller holds the lock."""
+        old = self.positions.get(symbol, 0.0)
+        new = old + notional
+        if abs(new) < 1e-9:
+            self.positions.pop(symbol, None)
+            new = 0.0
+        else:
+            self.positions[symbol] = new
+        self.gross += abs(new) - abs(old)
+
+    def exposure(self) -> dict:
+        """{gross_usd, equity_usd, account_leverage, positions}, from local state only."""
+        with self._lock:
+            return {
+                "gross_usd": self.gross,
+                "equity_usd": self.equity,
+                "account_leverage": self.gross / self.equity if self.equity else None,
+                "positions": dict(self.positions),
+            }
+
+    # --- Checks -------------------------------------------------------------------
+
+    def _check(self, symbol: str, side: str, size_usd: float, leverage: float) -> float:
+        """Signed notional of the order if it passes every limit; raises RiskRejection. Caller holds the lock."""
+        limits = self.limits
+        if side not in ("buy", "sell"):
+            raise RiskRejection("invalid_side", f"side must be buy or sell, got {side!r}", side=side)
+        if not size_usd > 0:
+            raise RiskRejection("invalid_size", f"size_usd must be positive, got {size_usd}", size_usd=size_usd)
+        if symbol in limits.blocked_symbols:
+            raise RiskRejection("symbol_blocked", f"{symbol} is blocked", symbol=symbol)
+        if limits.allowed_symbols is not None and symbol not in limits.allowed_symbols:
+            raise RiskRejection("symbol_not_allowed", f"{symbol} is not on the allowed list", symbol=symbol)
+        if limits.max_order_usd and size_usd > limits.max_order_usd:
+            raise RiskRejection("order_too_large",
+                                f"order ${size_usd:,.2f} exceeds the ${limits.max_order_usd:,.2f} limit",
+                                size_usd=size_usd, limit=limits.max_order_usd)
+        if limits.max_leverage and leverage > limits.max_leverage:
+            raise RiskRejection("leverage_too_high",
+                                f"leverage {leverage}x exceeds the {limits.max_leverage:g}x limit",
+                                leverage=leverage, limit=limits.max_leverage)
+
+        sign = _SIGN[side]
+        notional = sign * size_usd
+        old = self.positions.get(symbol, 0.0)
+        new = old + notional
+        if limits.max_position_usd and abs(new) > limits.max_position_usd and abs(new) > abs(old):
+            raise RiskRejection("position_limit",
+                                f"{symbol} position would be ${new:+,.2f}, limit ${limits.max_position_usd:,.2f}",
+                                symbol=symbol, current=old, projected=new, limit=limits.max_position_usd,
+                                max_size_usd=max(limits.max_position_usd - sign * old, 0.0))
+
+        gross = self.gross + abs(new) - abs(old)
+        if gross <= self.gross:
+            return notional  # orders that reduce exposure always pass the account limits
+        if limits.max_gross_usd and gross > limits.max_gross_usd:
+            raise RiskRejection("exposure_limit",
+                                f"gross exposure would be ${gross:,.2f}, limit ${limits.max_gross_usd:,.2f}",
+                                current=self.gross, projected=gross, limit=limits.max_gross_usd)
+        if limits.max_account_leverage and self.equity is not None:
+            if self.equity <= 0:
+                raise RiskRejection("account_leverage", "account equity is not positive", equity=self.equity)
+            if gross / self.equity > limits.max_account_leverage:
+                raise RiskRejection("account_leverage",
+                                    f"account leverage would be {gross / self.equity:.2f}x, "
+                                    f"limit {limits.max_account_leverage:g}x",
+                                    equity=self.equity, projected_gross=gross, limit=limits.max_account_leverage)
+        return notional
+
+    def check(self, symbol: str, side: str, size_usd: float, leverage: float = 1) -> None:
+        """Raise RiskRejection if the order would break a limit; reserves nothing."""
+        self._ensure_fresh()
+        with self._lock:
+            self.stats["checked"] += 1
+            try:
+                self._check(symbol, side, size_usd, leverage)
+            except RiskRejection:
+                self.stats["rejected"] += 1
+                raise
+
+    @contextmanager
+    def order(self, symbol: str, side: str, size_usd: float, leverage: float = 1):
+        """Check and reserve an order around the block that sends it; see the module docstring."""
+        self._ensure_fresh()
+        with self._lock:
+            self.stats["checked"] += 1
+            try:
+                notional = self._check(symbol, side, size_usd, leverage)
+            except RiskRejection:
+                self.stats["rejected"] += 1
+                raise
+            self._apply(symbol, notional)
+            self._reserved[symbol] = self._reserved.get(symbol, 0.0) + notional
+        try:
+            yield
+        except BaseException:
+            with self._lock:
+                self._apply(symbol, -notional)
+            raise
+        finally:
+            with self._lock:
+                remaining = self._reserved[symbol] - notional
+                if abs(remaining) < 1e-9:
+                    del self._reserved[symbol]
+                else:
+                    self._reserved[symbol] = remaining
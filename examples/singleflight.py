@@ -0,0 +1,160 @@
+"""
+Purple Flea Request Coalescing
+================================
+Single-flight for read calls: when many agents in one process ask for the
+same thing at the same moment (markets.get("BTC-PERP"),
+wallets.get_balances(wallet_id), domains.search(name=...)), only the first
+caller goes to the network and everyone else waits for and shares its result.
+
+Nothing is cached: once the call finishes, the next identical call goes out
+again. Callers that share a call receive the same result object, so treat
+results as read-only.
+
+    coalesce_reads(client, ["markets.get", "markets.list"])   # done by clients.build_client
+
+Threaded callers are coalesced inside the wrapped method. Asyncio callers
+going through async_agent.AsyncPurpleFleaClient are coalesced on the event
+loop, before a worker thread is even taken. SINGLE_FLIGHT.stats() reports
+calls, network executions and the dedup ratio.
+"""
+
+import asyncio
+import functools
+import json
+import threading
+
+import tracing
+
+# Read-only methods worth coalescing, per product
+READ_METHODS = {
+    "wallet": ["wallets.get_balances", "wallets.list_transactions"],
+    "trading": ["markets.get", "markets.list", "portfolio.get"],
+    "casino": ["games.list", "games.history"],
+    "domains": ["domains.search", "domains.list"],
+}
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Deduplicates concurrent calls that share a key."""
+
+    def __init__(self):
+        self.calls = 0
+        self.executions = 0
+        self._lock = threading.Lock()
+        self._inflight = {}  # key -> _Call
+        self._inflight_async = {}  # (loop id, key) -> asyncio.Task
+
+    def do(self, key, fn):
+        """Run fn(), or wait for the identical call already running on another thread."""
+        with self._lock:
+            self.calls += 1
+            call = self._inflight.get(key)
+            leader = call is None
+            if leader:
+                call = self._inflight[key] = _Call()
+                self.executions += 1
+
+        if not leader:
+            tracing.current_span().set(coalesced=True)
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._inflight[key]
+            call.done.set()
+
+    async def do_async(self, key, make_awaitable):
+        """
+        Await make_awaitable(), or the identical call already pending on this event loop.
+
+        The shared call runs as its own task and every caller, the first one
+        included, awaits it through asyncio.shield. Cancelling one caller (e.g.
+        its wait_for timing out) doesn't cancel the call for the others.
+        """
+        loop = asyncio.get_running_loop()
+        flight_key = (id(loop), key)
+        with self._lock:
+            self.calls += 1
+            task = self._inflight_async.get(flight_key)
+            leader = task is None
+            if leader:
+                task = self._inflight_async[flight_key] = asyncio.ensure_future(make_awaitable())
+                task.add_done_callback(functools.partial(self._finish_async, flight_key))
+                self.executions += 1
+
+        if not leader:
+            tracing.current_span().set(coalesced=True)
+        return await asyncio.shield(task)
+
+    def _finish_async(self, flight_key, task) -> None:
+        with self._lock:
+            if self._inflight_async.get(flight_key) is task:
+                del self._inflight_async[flight_key]
+        if not task.cancelled():
+            task.exception()  # mark retrieved when every caller gave up waiting
+
+    def stats(self) -> dict:
+        with self._lock:
+            shared = self.calls - self.executions
+            return {
+                "calls": self.calls,
+                "executions": self.executions,
+                "shared": shared,
+                "dedup_ratio": shared / self.calls if self.calls else 0.0,
+            }
+
+
+SINGLE_FLIGHT = SingleFlight()
+
+
+def call_key(name: str, args: tuple, kwargs: dict) -> str:
+    """Stable key for a call; arguments only need to be JSON-able or printable."""
+    return json.dumps([name, args, kwargs], sort_keys=True, default=str)
+
+
+def coalesce_reads(client, methods: list, flight: SingleFlight = SINGLE_FLIGHT, prefix: str = ""):
+    """
+    Wrap client's read methods (dotted paths like "markets.get") in single-flight.
+    Methods the client doesn't have are skipped. Returns the client.
+    """
+    for path in methods:
+        *parents, name = path.split(".")
+        target = client
+        try:
+            for parent in parents:
+                target = getattr(target, parent)
+            method = getattr(target, name)
+        except AttributeError:
+            continue
+        if hasattr(method, "key_for"):
+            continue  # already coalesced
+
+        full_name = f"{prefix}{path}"
+
+        def key_for(*args, _name=full_name, **kwargs):
+            return call_key(_name, args, kwargs)
+
+        @functools.wraps(method)
+        def coalesced(*args, _method=method, _key_for=key_for, **kwargs):
+            return flight.do(_key_for(*args, **kwargs), lambda: _method(*args, **kwargs))
+
+        coalesced.key_for = key_for
+        coalesced.flight = flight
+        setattr(target, name, coalesced)
+    return client
@@ -0,0 +1,195 @@
+"""
+Purple Flea Tool Registry
+===========================
+Tools are plain functions registered with a decorator. Their JSON schema,
+the product they call (for rate limiting), the input validator and the
+dispatch entry all come from the one definition, so they can't drift apart:
+
+    @tool("trading", params={"symbol": "Market symbol", "side": {"enum": ["buy", "sell"]}})
+    def place_trade(symbol: str, side: str, size_usd: float) -> str:
+        \"\"\"Place a market order to buy or sell\"\"\"
+        ...
+
+The schema is built from the signature: str/int/float/bool/list[...] become
+JSON types, and parameters without a default are required. params adds a
+description (a string) or extra schema keys (a dict) per parameter. The
+first docstring paragraph is the tool description. Tools with side effects
+that must not be repeated (orders, bets, registrations) pass
+idempotent=False, so a caller that loses track of a call knows not to retry it.
+
+Dispatch is a dict lookup. Each tool's validator is compiled once at
+registration into a flat list of checks, so a call costs the same with 8
+tools or 800.
+
+Other modules can add tools without touching full_agent.py. Either list them
+in PURPLEFLEA_TOOL_MODULES (comma-separated module names), or publish a
+"purpleflea.tools" entry point in a package. Both are imported by
+load_plugins(), and importing a module registers its @tool functions.
+"""
+
+import importlib
+import inspect
+import os
+import typing
+from importlib.metadata import entry_points
+
+_JSON_TYPES = {str: "string", int: "integer", float: "number", bool: "boolean", list: "array", dict: "object"}
+_PY_TYPES = {"string": (str,), "integer": (int,), "number": (int, float), "boolean": (bool,),
+             "array": (list, tuple), "object": (dict,)}
+
+
+class ToolInputError(ValueError):
+    """Tool input that doesn't match the tool's schema."""
+
+
+def _json_schema(annotation) -> dict:
+    origin = typing.get_origin(annotation)
+    if origin in (list, tuple):
+        args = typing.get_args(annotation)
+        return {"type": "array", **({"items": _json_schema(args[0])} if args else {})}
+    if annotation in _JSON_TYPES:
+        return {"type": _JSON_TYPES[annotation]}
+    raise TypeError(f"unsupported tool parameter type: {annotation!r}")
+
+
+def _type_check(name: str, schema: dict):
+    """One compiled check for a property: raises ToolInputError or returns None."""
+    json_type = schema["type"]
+    allowed = _PY_TYPES[json_type]
+    strict_number = json_type in ("integer", "number")  # bool is an int subclass; reject it
+    enum = frozenset(schema["enum"]) if "enum" in schema else None
+    low, high = schema.get("minimum"), schema.get("maximum")
+    item_check = _type_check(f"{name}[]", schema["items"]) if "items" in schema else None
+
+    def check(value):
+        if not isinstance(value, allowed) or (strict_number and isinstance(value, bool)):
+            raise ToolInputError(f"{name} must be {json_type}, got {type(value).__name__}")
+        if enum is not None and value not in enum:
+            raise ToolInputError(f"{name} must be one of {sorted(enum)}, got {value!r}")
+        if low is not None and value < low:
+            raise ToolInputError(f"{name} must be at least {low}, got {value}")
+        if high is not None and value > high:
+            raise ToolInputError(f"{name} must be at most {high}, got {value}")
+        if item_check is not None:
+            for item in value:
+                item_check(item)
+
+    return check
+
+
+class Tool:
+    """One registered tool: handler, schema and compiled validator."""
+
+    __slots__ = ("name", "product", "handler", "schema", "hidden", "idempotent", "_required", "_checks")
+
+    def __init__(self, handler, product: str, name: str = None, description: str = None,
+                 params: dict = None, hidden: bool = False, idempotent: bool = True):
+        self.name = name or handler.__name__
+        self.product = product
+        self.handler = handler
+        self.hidden = hidden
+        self.idempotent = idempotent
+        params = params or {}
+
+        hints = typing.get_type_hints(handler)
+        properties, required = {}, []
+        for param in inspect.signature(handler).parameters.values():
+            if param.name not in hints:
+                raise TypeError(f"{self.name}: parameter {param.name} needs a type annotation")
+            schema = _json_schema(hints[param.name])
+            extra = params.get(param.name, {})
+            schema.update({"description": extra} if isinstance(extra, str) else extra)
+            properties[param.name] = schema
+            if param.default is inspect.Parameter.empty:
+                required.append(param.name)
+        unknown = set(params) - set(properties)
+        if unknown:
+            raise TypeError(f"{self.name}: params for unknown arguments {sorted(unknown)}")
+
+        description = description or (inspect.getdoc(handler) or "").split("\n\n")[0].replace("\n", " ")
+        self.schema = {
+            "name": self.name,
+            "description": description,
+            "input_schema": {"type": "object", "properties": properties,
+                             **({"required": required} if required else {})},
+        }
+        self._required = tuple(required)
+        self._checks = {prop: _type_check(prop, schema) for prop, schema in properties.items()}
+
+    def validate(self, tool_input: dict) -> None:
+        for prop in self._required:
+            if tool_input.get(prop) is None:
+                raise ToolInputError(f"missing required input: {prop}")
+        checks = self._checks
+        for prop, value in tool_input.items():
+            check = checks.get(prop)
+            if check is None:
+                raise ToolInputError(f"unexpected input: {prop}")
+            if value is not None:
+                check(value)
+
+    def __call__(self, tool_input: dict) -> str:
+        self.validate(tool_input)
+        return self.handler(**tool_input)
+
+
+class ToolRegistry:
+    """Name -> Tool table plus the schema list sent to the model."""
+
+    def __init__(self):
+        self._tools = {}
+        self._plugins_loaded = False
+
+    def tool(self, product: str, *, name: str = None, description: str = None,
+             params: dict = None, hidden: bool = False, idempotent: bool = True):
+        """Decorator registering a handler; hidden tools are dispatchable but not advertised."""
+        def register(handler):
+            entry = Tool(handler, product, name, description, params, hidden, idempotent)
+            if entry.name in self._tools:
+                raise ValueError(f"tool {entry.name!r} is already registered")
+            self._tools[entry.name] = entry
+            return handler
+
+        return register
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._tools
+
+    def __len__(self) -> int:
+        return len(self._tools)
+
+    def get(self, name: str):
+        return self._tools.get(name)
+
+    def dispatch(self, name: str, tool_input: dict) -> str:
+        """Validate tool_input and run the tool; raises ToolInputError on bad input."""
+        entry = self._tools.get(name)
+        if entry is None:
+            return f"Unknown tool: {name}"
+        return entry(tool_input)
+
+    def schemas(self) -> list:
+        """Tool definitions for messages.create, in registration order."""
+        return [entry.schema for entry in self._tools.values() if not entry.hidden]
+
+    def products(self) -> dict:
+        """{tool name: Purple Flea product} for every tool, hidden ones included."""
+        return {name: entry.product for name, entry in self._tools.items()}
+
+    def load_plugins(self) -> list:
+        """Import tool modules from PURPLEFLEA_TOOL_MODULES and "purpleflea.tools" entry points (once)."""
+        if self._plugins_loaded:
+            return []
+        self._plugins_loaded = True
+        loaded = []
+        for module in filter(None, (m.strip() for m in os.environ.get("PURPLEFLEA_TOOL_MODULES", "").split(","))):
+            importlib.import_module(module)
+            loaded.append(module)
+        for entry_point in entry_points(group="purpleflea.tools"):
+            entry_point.load()
+            loaded.append(entry_point.value)
+        return loaded
+
+
+TOOL_REGISTRY = ToolRegistry()
+tool = TOOL_REGISTRY.tool
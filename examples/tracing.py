@@ -0,0 +1,306 @@
+"""
+Purple Flea Tracing Hooks
+===========================
+Spans around every model call, tool dispatch and HTTP request, so you can see
+where an agent's time goes.
+
+    with tracing.span("tool", "place_trade") as s:
+        ...
+        if s:                       # False when tracing is off; guard costly attributes
+            s.set(result_chars=len(result))
+
+Span kinds used by the examples:
+  llm   one messages.create / stream turn: tokens in/out, cache read/write
+  tool  one execute_tool call: input/result size, cache status, error
+  http  one request through transport.RateLimitedAdapter: status, bytes, retries
+  turn  one agent turn: parent of its llm span and of the tool calls it asked for
+
+Pool threads don't inherit the submitting thread's span; submit wrap(fn) to
+keep tool spans under the turn that started them.
+
+Finished spans go to hooks: objects with on_start(span) and on_end(span).
+HISTOGRAMS, the in-process registry, keeps latency histograms and attribute
+totals per (kind, name). OpenTelemetryHook forwards spans to an OpenTelemetry
+tracer when opentelemetry-api is installed.
+
+Tracing is off until enable() is called or PURPLEFLEA_TRACING=1 is set. While
+off, span() returns a shared no-op span and costs one function call.
+  PURPLEFLEA_TRACING=1        enable with the histogram registry
+  PURPLEFLEA_TRACING_OTEL=1   also export to OpenTelemetry
+"""
+
+import bisect
+import contextvars
+import os
+import threading
+import time
+from collections import Counter
+
+_hooks = ()
+_current = contextvars.ContextVar("purpleflea_span", default=None)
+
+
+class _NoopSpan:
+    """Returned while tracing is off; falsy so callers can skip computing attributes."""
+
+    __slots__ = ()
+
+    def __bool__(self) -> bool:
+        return False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc) -> None:
+        pass
+
+    def set(self, **attrs) -> None:
+        pass
+
+    def fail(self, error: BaseException) -> None:
+        pass
+
+
+NOOP_SPAN = _NoopSpan()
+
+
+class Span:
+    """One timed operation. Use as a context manager; exceptions mark it failed and propagate."""
+
+    __slots__ = ("kind", "name", "attrs", "parent", "start", "duration", "error", "_token", "hook_state")
+
+    def __init__(self, kind: str, name: str, attrs: dict):
+        self.kind = kind
+        self.name = name
+        self.attrs = attrs
+        self.parent = None
+        self.start = 0.0
+        self.duration = None
+        self.error = None
+        self._token = None
+        self.hook_state = {}  # per-hook scratch space, e.g. the OpenTelemetry span
+
+    def __bool__(self) -> bool:
+        return True
+
+    def set(self, **attrs) -> None:
+        self.attrs.update(attrs)
+
+    def fail(self, error: BaseException) -> None:
+        """Mark the span failed without raising (for errors the caller handles)."""
+        self.error = f"{type(error).__name__}: {error}"
+
+    def __enter__(self):
+        self.parent = _current.get()
+        self._token = _current.set(self)
+        for hook in _hooks:
+            hook.on_start(self)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.duration = time.perf_counter() - self.start
+        if exc is not None and self.error is None:
+            self.fail(exc)
+        _current.reset(self._token)
+        for hook in _hooks:
+            hook.on_end(self)
+
+
+def span(kind: str, name: str, **attrs):
+    """A new span, or NOOP_SPAN while tracing is off."""
+    if not _hooks:
+        return NOOP_SPAN
+    return Span(kind, name, attrs)
+
+
+def current_span():
+    """The innermost open span in this thread / task, or NOOP_SPAN."""
+    if not _hooks:
+        return NOOP_SPAN
+    return _current.get() or NOOP_SPAN
+
+
+def wrap(fn, parent=None):
+    """fn, run as a child of parent (default: the current span) on whatever thread calls it."""
+    if not _hooks:
+        return fn
+    parent = parent or _current.get()
+
+    def run(*args, **kwargs):
+        token = _current.set(parent)
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            _current.reset(token)
+
+    return run
+
+
+def enabled() -> bool:
+    return bool(_hooks)
+
+
+def add_hook(hook) -> None:
+    global _hooks
+    if hook not in _hooks:
+        _hooks = (*_hooks, hook)
+
+
+def remove_hook(hook) -> None:
+    global _hooks
+    _hooks = tuple(h for h in _hooks if h is not hook)
+
+
+def usage_attrs(usage) -> dict:
+    """Span attributes for an Anthropic response's usage block."""
+    return {
+        "input_tokens": getattr(usage, "input_tokens", 0) or 0,
+        "output_tokens": getattr(usage, "output_tokens", 0) or 0,
+        "cache_read_tokens": getattr(usage, "cache_read_input_tokens", 0) or 0,
+        "cache_write_tokens": getattr(usage, "cache_creation_input_tokens", 0) or 0,
+    }
+
+
+# --- In-process histogram registry --------------------------------------------
+
+# Bucket upper bounds in milliseconds, roughly 1.5x apart from 0.1ms to ~2 minutes
+BUCKET_BOUNDS_MS = tuple(round(0.1 * 1.5 ** i, 3) for i in range(35))
+
+
+class Histogram:
+    """Fixed-bucket latency histogram with attribute totals."""
+
+    def __init__(self):
+        self.buckets = [0] * (len(BUCKET_BOUNDS_MS) + 1)
+        self.count = 0
+        self.errors = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.sums = Counter()  # numeric attributes: retries, bytes, tokens
+        self.values = Counter()  # (attribute, value) for everything else, e.g. ("cache", "hit")
+
+    def add(self, s: Span) -> None:
+        ms = s.duration * 1000
+        self.buckets[bisect.bisect_left(BUCKET_BOUNDS_MS, ms)] += 1
+        self.count += 1
+        self.total_ms += ms
+        self.max_ms = max(self.max_ms, ms)
+        if s.error is not None:
+            self.errors += 1
+        for key, value in s.attrs.items():
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                self.values[(key, value)] += 1
+            else:
+                self.sums[key] += value
+
+    def percentile(self, pct: float) -> float:
+        """Upper bound (ms) of the bucket holding the pct-th percentile, capped at the max."""
+        if not self.count:
+            return 0.0
+        rank = pct / 100 * self.count
+        seen = 0
+        for i, n in enumerate(self.buckets):
+            seen += n
+            if seen >= rank and n:
+                return min(BUCKET_BOUNDS_MS[i], self.max_ms) if i < len(BUCKET_BOUNDS_MS) else self.max_ms
+        return self.max_ms
+
+
+class HistogramRegistry:
+    """Hook that aggregates finished spans per (kind, name)."""
+
+    def __init__(self):
+        self._histograms = {}
+        self._lock = threading.Lock()
+
+    def on_start(self, s: Span) -> None:
+        pass
+
+    def on_end(self, s: Span) -> None:
+        with self._lock:
+            histogram = self._histograms.get((s.kind, s.name))
+            if histogram is None:
+                histogram = self._histograms[(s.kind, s.name)] = Histogram()
+            histogram.add(s)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._histograms.clear()
+
+    def snapshot(self) -> dict:
+        """{(kind, name): {count, errors, mean_ms, p50_ms, p99_ms, max_ms, sums, values}}."""
+        with self._lock:
+            return {
+                key: {
+                    "count": h.count,
+                    "errors": h.errors,
+                    "mean_ms": h.total_ms / h.count,
+                    "p50_ms": h.percentile(50),
+                    "p99_ms": h.percentile(99),
+                    "max_ms": h.max_ms,
+                    "sums": dict(h.sums),
+                    "values": {f"{k}={v}": n for (k, v), n in h.values.items()},
+                }
+                for key, h in self._histograms.items()
+            }
+
+    def print_summary(self) -> None:
+        print(f"\n{'span':<40} {'n':>6} {'err':>4} {'p50 ms':>9} {'p99 ms':>9} {'max ms':>9}")
+        for (kind, name), s in sorted(self.snapshot().items()):
+            print(f"{kind + ' ' + name:<40.40} {s['count']:>6} {s['errors']:>4} "
+                  f"{s['p50_ms']:>9.1f} {s['p99_ms']:>9.1f} {s['max_ms']:>9.1f}")
+            details = {**s["sums"], **s["values"]}
+            if details:
+                print(f"    {', '.join(f'{k}: {v:g}' if isinstance(v, float) else f'{k}: {v}' for k, v in details.items())}")
+
+
+HISTOGRAMS = HistogramRegistry()
+
+
+# --- OpenTelemetry --------------------------------------------------------------
+
+class OpenTelemetryHook:
+    """Mirrors spans into an OpenTelemetry tracer (needs opentelemetry-api)."""
+
+    def __init__(self, tracer=None):
+        from opentelemetry import context, trace
+
+        self._context = context
+        self._trace = trace
+        self.tracer = tracer or trace.get_tracer("purpleflea.agent")
+
+    def on_start(self, s: Span) -> None:
+        # Parent explicitly: on a pool thread (tracing.wrap) the ambient OTel context is empty
+        parent = s.parent.hook_state.get("otel") if s.parent is not None else None
+        context = self._trace.set_span_in_context(parent[0]) if parent else None
+        otel_span = self.tracer.start_span(f"{s.kind} {s.name}", context=context)
+        s.hook_state["otel"] = (otel_span, self._context.attach(self._trace.set_span_in_context(otel_span)))
+
+    def on_end(self, s: Span) -> None:
+        if "otel" not in s.hook_state:
+            return  # the hook was added while this span was open
+        otel_span, token = s.hook_state["otel"]  # kept, so late children can still parent to it
+        otel_span.set_attributes({"purpleflea.kind": s.kind, **{
+            f"purpleflea.{k}": v for k, v in s.attrs.items() if isinstance(v, (str, bool, int, float))
+        }})
+        if s.error is not None:
+            otel_span.set_status(self._trace.Status(self._trace.StatusCode.ERROR, s.error))
+        otel_span.end()
+        self._context.detach(token)
+
+
+def enable(opentelemetry: bool = False) -> None:
+    """Turn tracing on with the histogram registry, plus OpenTelemetry export if asked."""
+    add_hook(HISTOGRAMS)
+    if opentelemetry:
+        add_hook(OpenTelemetryHook())
+
+
+def disable() -> None:
+    global _hooks
+    _hooks = ()
+
+
+if os.environ.get("PURPLEFLEA_TRACING") == "1":
+    enable(opentelemetry=os.environ.get("PURPLEFLEA_TRACING_OTEL") == "1")
@@ -11,24 +11,30 @@ Referral code STARTER earns 20% of trading fees.
 Sign up: https://purpleflea.com/referral?code=STARTER
 """
 
-import os
 from dotenv import load_dotenv
-from purpleflea import TradingClient
+
+from clients import lazy_client
+from ledger import ledger
+from market_cache import MarketCache, freshness
+from market_feed import MarketFeed
+from risk import RiskEngine, RiskRejection
 
 load_dotenv()
 
 # 20% referral on all trading fees with code STARTER
-client = TradingClient(
-    api_key=os.environ["PURPLEFLEA_API_KEY"],
-    referral_code=os.environ.get("PURPLEFLEA_REFERRAL_CODE", "STARTER"),
-    base_url=os.environ.get("PURPLEFLEA_TRADING_API", "https://trading.purpleflea.com/api/v1"),
-)
+client = lazy_client("TradingClient", "trading")
+
+# Short-lived cache so repeated lookups of the same symbol skip the round-trip
+market_cache = MarketCache(client)
+
+# Local pre-trade limits, so a bad order is refused before it costs a round-trip
+risk = RiskEngine(client)
 
 
 def get_market_price(symbol: str) -> dict:
     """Get current price and 24h stats for a market."""
-    market = client.markets.get(symbol)
-    print(f"\n{symbol}:")
+    market, age = market_cache.get(symbol, fields=("price", "change_24h", "volume_24h", "funding_rate"))
+    print(f"\n{symbol}:{freshness(age)}")
     print(f"  Price: ${market.price:,.2f}")
     print(f"  24h Change: {market.change_24h:+.2f}%")
     print(f"  24h Volume: ${market.volume_24h:,.0f}")
@@ -36,30 +42,52 @@ def get_market_price(symbol: str) -> dict:
     return market
 
 
-def scan_opportunities(min_volume_usd: float = 1_000_000) -> list:
-    """Scan all markets for high-volume opportunities."""
-    markets = client.markets.list(min_volume=min_volume_usd)
-    movers = sorted(markets, key=lambda m: abs(m["change_24h"]), reverse=True)[:10]
-    print(f"\nTop 10 movers (>{min_volume_usd/1e6:.0f}M volume):")
+def scan_opportunities(min_volume_usd: float = 1_000_000, feed: MarketFeed = None) -> list:
+    """
+    Scan all markets for high-volume opportunities.
+    Pass a running MarketFeed to read movers from local state instead of downloading every market.
+    """
+    if feed is not None:
+        movers, age = feed.top_movers(10, min_volume=min_volume_usd), None
+    else:
+        from market_snapshot import MarketSnapshot  # deferred: numpy is only needed here
+
+        markets, age = market_cache.list(min_volume=min_volume_usd)
+        snapshot = MarketSnapshot.from_markets(markets)
+        movers = snapshot.filter(min_volume=min_volume_usd).top_k(10, by="abs_change_24h").to_dicts()
+    print(f"\nTop 10 movers (>{min_volume_usd/1e6:.0f}M volume):{freshness(age)}")
     for m in movers:
         print(f"  {m['symbol']}: {m['change_24h']:+.1f}% | ${m['price']:,.2f} | Vol: ${m['volume_24h']/1e6:.1f}M")
     return movers
 
 
+def _record_rejection(e: RiskRejection, symbol: str, side: str, size_usd: float, order_type: str) -> None:
+    ledger.record("trading", "rejected", subject=symbol, amount=size_usd, side=side, type=order_type,
+                  reason=e.to_dict())
+    print(f"\nOrder rejected ({e.code}): {e}")
+
+
 def place_market_order(
     symbol: str,
     side: str,  # "buy" or "sell"
     size_usd: float,
     leverage: int = 1,
 ) -> dict:
-    """Place a market order for an asset."""
-    order = client.orders.create(
-        symbol=symbol,
-        side=side,
-        type="market",
-        size_usd=size_usd,
-        leverage=leverage,
-    )
+    """Place a market order for an asset. Raises RiskRejection if it breaks a local risk limit."""
+    try:
+        with risk.order(symbol, side, size_usd, leverage=leverage):
+            order = client.orders.create(
+                symbol=symbol,
+                side=side,
+                type="market",
+                size_usd=size_usd,
+                leverage=leverage,
+            )
+    except RiskRejection as e:
+        _record_rejection(e, symbol, side, size_usd, "market")
+        raise
+    ledger.record("trading", "order", subject=order.symbol, amount=size_usd, side=side,
+                  type="market", leverage=leverage, fill_price=order.fill_price, order_id=order.id)
     print(f"\nOrder placed:")
     print(f"  Symbol: {order.symbol}")
     print(f"  Side: {order.side.upper()}")
@@ -77,16 +105,26 @@ def place_limit_order(
     stop_loss: float = None,
     take_profit: float = None,
 ) -> dict:
-    """Place a limit order with optional stop-loss and take-profit."""
-    order = client.orders.create(
-        symbol=symbol,
-        side=side,
-        type="limit",
-        size_usd=size_usd,
-        limit_price=limit_price,
-        stop_loss=stop_loss,
-        take_profit=take_profit,
-    )
+    """
+    Place a limit order with optional stop-loss and take-profit.
+    Raises RiskRejection if it breaks a local risk limit; risk counts it as filled until the next resync.
+    """
+    try:
+        with risk.order(symbol, side, size_usd):
+            order = client.orders.create(
+                symbol=symbol,
+                side=side,
+                type="limit",
+                size_usd=size_usd,
+                limit_price=limit_price,
+                stop_loss=stop_loss,
+                take_profit=take_profit,
+            )
+    except RiskRejection as e:
+        _record_rejection(e, symbol, side, size_usd, "limit")
+        raise
+    ledger.record("trading", "order", subject=order.symbol, amount=size_usd, side=side, type="limit",
+                  limit_price=limit_price, stop_loss=stop_loss, take_profit=take_profit, order_id=order.id)
     print(f"\nLimit order placed:")
     print(f"  {order.side.upper()} {order.symbol} @ ${limit_price:,.2f}")
     if stop_loss:
@@ -100,6 +138,7 @@ def place_limit_order(
 def get_portfolio() -> dict:
     """Get current open positions and P&L."""
     portfolio = client.portfolio.get()
+    risk.load(portfolio)
     print(f"\nPortfolio Summary:")
     print(f"  Total Value: ${portfolio.total_value:,.2f}")
     print(f"  Unrealized P&L: ${portfolio.unrealized_pnl:+,.2f}")
@@ -113,6 +152,8 @@ def get_portfolio() -> dict:
 def close_position(position_id: str) -> dict:
     """Close an open position at market price."""
     result = client.positions.close(position_id)
+    risk.invalidate()
+    ledger.record("trading", "close", subject=position_id, pnl=result.realized_pnl)
     print(f"\nClosed position {position_id}")
     print(f"  Realized P&L: ${result.realized_pnl:+.2f}")
     return result
@@ -128,6 +169,8 @@ if __name__ == "__main__":
     eth = get_market_price("ETH-PERP")
     movers = scan_opportunities(min_volume_usd=10_000_000)
     portfolio = get_portfolio()
+    print(f"\nMarket cache: {market_cache.stats()}")
+    print(f"Risk exposure: {risk.exposure()}")
 
     # Example limit order (commented out to avoid accidental execution)
     # order = place_limit_order("BTC-PERP", "buy", 100.0, btc.price * 0.99, stop_loss=btc.price * 0.97)
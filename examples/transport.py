@@ -0,0 +1,236 @@
+"""
+Purple Flea Rate-Limit-Aware Transport
+========================================
+The HTTP adapter under all four Purple Flea clients (mounted by clients.py).
+
+For every request it:
+1. Waits for a token from a per-endpoint token bucket, so the process stays
+   under the API's rate limit instead of discovering it via 429s.
+2. Reads X-RateLimit-Remaining / X-RateLimit-Reset and Retry-After headers and
+   pauses that endpoint's bucket until the server says to come back.
+3. Retries 429s with jittered exponential backoff. 5xx responses and
+   connection errors are retried only for idempotent methods, so an order or
+   a bet is never sent twice.
+4. Gives up once the per-call deadline would be exceeded, returning the last
+   response so the caller sees the real status.
+
+Limits shared with other processes (fleet_runner's shared-memory buckets) are
+registered per base URL with add_shared_limiter() and charged once per HTTP
+attempt, after the local bucket.
+
+Throttling events go to the "purpleflea.transport" logger, and counters are
+kept in TRANSPORT_METRICS. With tracing on, each call is an "http" span
+carrying its status, request/response bytes and retry count.
+
+Tuning:
+  PURPLEFLEA_ENDPOINT_RPS     requests/second per endpoint (default 10)
+  PURPLEFLEA_MAX_RETRIES      retries per call (default 4)
+  PURPLEFLEA_CALL_DEADLINE    seconds per call including retries (default 30)
+"""
+
+import email.utils
+import logging
+import os
+import random
+import threading
+import time
+from collections import Counter
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+import tracing
+
+logger = logging.getLogger("purpleflea.transport")
+
+ENDPOINT_RPS = float(os.environ.get("PURPLEFLEA_ENDPOINT_RPS", "10"))
+MAX_RETRIES = int(os.environ.get("PURPLEFLEA_MAX_RETRIES", "4"))
+CALL_DEADLINE = float(os.environ.get("PURPLEFLEA_CALL_DEADLINE", "30"))
+BACKOFF_BASE = 0.25
+BACKOFF_CAP = 8.0
+
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+RETRY_STATUSES = frozenset({500, 502, 503, 504})
+
+# requests, throttled (429), server_errors, retries, gave_up, bucket_wait_seconds
+TRANSPORT_METRICS = Counter()
+_metrics_lock = threading.Lock()
+
+
+def _count(name: str, amount: float = 1) -> None:
+    with _metrics_lock:
+        TRANSPORT_METRICS[name] += amount
+
+
+class TokenBucket:
+    """Thread-safe token bucket that can also be paused until a point in time."""
+
+    def __init__(self, rate: float, capacity: float = None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(rate, 1.0)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def pause_until(self, resume_at: float) -> None:
+        """Hold all requests until resume_at (time.monotonic() clock)."""
+        with self._lock:
+            self._paused_until = max(self._paused_until, resume_at)
+            self._tokens = 0.0
+
+    def acquire(self, deadline: float) -> bool:
+        """Block until a token is available; False if that would pass deadline."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                if now < self._paused_until:
+                    wait = self._paused_until - now
+                else:
+                    self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                    self._updated = now
+                    if self._tokens >= 1:
+                        self._tokens -= 1
+                        return True
+                    wait = (1 - self._tokens) / self.rate
+            if now + wait > deadline:
+                return False
+            _count("bucket_wait_seconds", wait)
+            time.sleep(wait)
+
+
+# URL prefix -> limiter with try_acquire() -> seconds to wait (0 = granted)
+SHARED_LIMITERS = {}
+
+
+def add_shared_limiter(url_prefix: str, limiter) -> None:
+    """Also charge limiter for every request whose URL starts with url_prefix."""
+    SHARED_LIMITERS[url_prefix] = limiter
+
+
+def _acquire_shared(url: str, deadline: float) -> bool:
+    """Wait for the shared limiters covering url; False if that would pass deadline."""
+    for prefix, limiter in SHARED_LIMITERS.items():
+        if not url.startswith(prefix):
+            continue
+        while (wait := limiter.try_acquire()) > 0:
+            if time.monotonic() + wait > deadline:
+                return False
+            _count("bucket_wait_seconds", wait)
+            time.sleep(wait)
+    return True
+
+
+def endpoint_key(url: str) -> str:
+    """Bucket key: host plus the first path segment below the API version (ids are dropped)."""
+    parts = urlsplit(url)
+    segments = [s for s in parts.path.split("/") if s]
+    return f"{parts.netloc}/{'/'.join(segments[:3])}"
+
+
+def retry_after_seconds(response) -> float:
+    """Seconds the server asked us to wait, from Retry-After or X-RateLimit-Reset; 0 if none."""
+    retry_after = response.headers.get("Retry-After")
+    if retry_after:
+        try:
+            return max(float(retry_after), 0.0)
+        except ValueError:
+            pass
+        try:
+            when = email.utils.parsedate_to_datetime(retry_after)
+            return max(when.timestamp() - time.time(), 0.0)
+        except (TypeError, ValueError):
+            return 0.0
+
+    if response.headers.get("X-RateLimit-Remaining") == "0":
+        reset = response.headers.get("X-RateLimit-Reset")
+        try:
+            reset = float(reset)
+        except (TypeError, ValueError):
+            return 0.0
+        # Either an epoch timestamp or seconds from now
+        return max(reset - time.time(), 0.0) if reset > 1e9 else reset
+    return 0.0
+
+
+def backoff_seconds(attempt: int) -> float:
+    """Full-jitter exponential backoff."""
+    return random.uniform(0, min(BACKOFF_CAP, BACKOFF_BASE * 2 ** attempt))
+
+
+class RateLimitedAdapter(HTTPAdapter):
+    """HTTPAdapter with per-endpoint token buckets, header-driven pauses and jittered retries."""
+
+    def __init__(self, *args, rate: float = ENDPOINT_RPS, retries: int = MAX_RETRIES,
+                 deadline: float = CALL_DEADLINE, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.rate = rate
+        self.retries = retries
+        self.deadline = deadline
+        self._buckets = {}
+        self._buckets_lock = threading.Lock()
+
+    def bucket(self, url: str) -> TokenBucket:
+        key = endpoint_key(url)
+        with self._buckets_lock:
+            if key not in self._buckets:
+                self._buckets[key] = TokenBucket(self.rate)
+            return self._buckets[key]
+
+    def send(self, request, **kwargs):
+        with tracing.span("http", f"{request.method} {endpoint_key(request.url)}") as span:
+            response = self._send(request, span, **kwargs)
+            if span:
+                span.set(status=str(response.status_code), request_bytes=len(request.body or b""),
+                         response_bytes=int(response.headers.get("Content-Length") or 0))
+            return response
+
+    def _send(self, request, span, **kwargs):
+        deadline = time.monotonic() + self.deadline
+        bucket = self.bucket(request.url)
+        idempotent = request.method in IDEMPOTENT_METHODS
+        response = None
+
+        for attempt in range(self.retries + 1):
+            if not bucket.acquire(deadline) or not _acquire_shared(request.url, deadline):
+                break
+            _count("requests")
+            try:
+                response = super().send(request, **kwargs)
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if not idempotent or attempt == self.retries:
+                    raise
+                wait = backoff_seconds(attempt)
+                logger.info("connection error on %s %s (%s); retrying in %.2fs", request.method, request.url, e, wait)
+            else:
+                server_wait = retry_after_seconds(response)
+                if server_wait:
+                    bucket.pause_until(time.monotonic() + server_wait)
+
+                if response.status_code == 429:
+                    _count("throttled")
+                elif response.status_code in RETRY_STATUSES and idempotent:
+                    _count("server_errors")
+                else:
+                    return response
+
+                if attempt == self.retries:
+                    break
+                wait = max(server_wait, backoff_seconds(attempt))
+                logger.info("%s on %s %s; retrying in %.2fs (attempt %d/%d)", response.status_code,
+                            request.method, request.url, wait, attempt + 1, self.retries)
+
+            if time.monotonic() + wait > deadline:
+                break
+            _count("retries")
+            span.set(retries=attempt + 1)
+            if response is not None:
+                response.content  # read the error body so the connection goes back to the pool
+            time.sleep(wait)
+
+        _count("gave_up")
+        logger.warning("giving up on %s %s", request.method, request.url)
+        if response is None:
+            raise requests.Timeout(f"rate limit wait for {request.url} exceeded the {self.deadline:g}s deadline")
+        return response
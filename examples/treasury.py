@@ -0,0 +1,133 @@
+"""
+Purple Flea Treasury View
+===========================
+Aggregates token balances across thousands of agent wallets on ethereum,
+base, solana and bitcoin.
+
+    treasury = TreasuryView(client)
+    treasury.refresh(wallet_ids)          # concurrent, bounded fetch
+    treasury.totals_by_chain()            # {"base": Decimal("1234.50"), ...} in USD
+    treasury.totals_by_token()            # {("base", "USDC"): {"balance": ..., "usd": ...}}
+
+Every wallet keeps a parsed snapshot (amounts are converted to Decimal once,
+when fetched) and a version: the response's "version"/"etag" field when the
+API sends one, otherwise a fingerprint of its contents. A refresh only
+touches the totals for wallets whose version changed; each changed wallet's
+old holdings are subtracted and its new ones added, so totals never need a
+full rescan.
+"""
+
+import hashlib
+import json
+import threading
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+
+ZERO = Decimal(0)
+
+
+def parse_holdings(balances: dict) -> dict:
+    """{(chain, symbol): (balance, usd_value)} as Decimals, skipping zero balances."""
+    holdings = {}
+    for chain, tokens in balances.items():
+        if not isinstance(tokens, list):
+            continue  # version / etag / metadata fields
+        for token in tokens:
+            balance = Decimal(str(token["balance"]))
+            if balance:
+                usd = Decimal(str(token.get("usd_value", 0)))
+                previous = holdings.get((chain, token["symbol"]), (ZERO, ZERO))
+                holdings[(chain, token["symbol"])] = (previous[0] + balance, previous[1] + usd)
+    return holdings
+
+
+def balances_version(balances: dict) -> str:
+    """The API's version/etag for a balances response, or a fingerprint of its contents."""
+    for field in ("version", "etag"):
+        if balances.get(field) is not None:
+            return str(balances[field])
+    return hashlib.sha1(json.dumps(balances, sort_keys=True, default=str).encode()).hexdigest()
+
+
+class TreasuryView:
+    """Incrementally maintained balance totals over many wallets."""
+
+    def __init__(self, client, max_workers: int = 16):
+        self.client = client
+        self.max_workers = max_workers
+        self.snapshots = {}  # wallet_id -> (version, holdings)
+        self._totals = defaultdict(lambda: [ZERO, ZERO])  # (chain, symbol) -> [balance, usd]
+        self._lock = threading.Lock()
+
+    def _fetch(self, wallet_id: str):
+        try:
+            return wallet_id, self.client.wallets.get_balances(wallet_id), None
+        except Exception as e:
+            return wallet_id, None, e
+
+    def refresh(self, wallet_ids: list) -> dict:
+        """
+        Fetch balances for wallet_ids with at most max_workers in flight and fold
+        in the ones that changed. Returns counts of changed, unchanged and failed wallets.
+        """
+        summary = {"changed": 0, "unchanged": 0, "failed": {}}
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            for wallet_id, balances, error in pool.map(self._fetch, wallet_ids):
+                if error is not None:
+                    summary["failed"][wallet_id] = str(error)
+                    continue
+                version = balances_version(balances)
+                with self._lock:
+                    current = self.snapshots.get(wallet_id)
+                    if current is not None and current[0] == version:
+                        summary["unchanged"] += 1
+                        continue
+                    self._replace(wallet_id, (version, parse_holdings(balances)))
+                summary["changed"] += 1
+        return summary
+
+    def remove_wallet(self, wallet_id: str) -> None:
+        """Take a wallet out of the totals."""
+        with self._lock:
+            self._replace(wallet_id, None)
+
+    def _replace(self, wallet_id: str, snapshot) -> None:
+        old = self.snapshots.pop(wallet_id, None)
+        if old is not None:
+            for key, (balance, usd) in old[1].items():
+                total = self._totals[key]
+                total[0] -= balance
+                total[1] -= usd
+                if not total[0]:
+                    del self._totals[key]
+        if snapshot is not None:
+            self.snapshots[wallet_id] = snapshot
+            for key, (balance, usd) in snapshot[1].items():
+                total = self._totals[key]
+                total[0] += balance
+                total[1] += usd
+
+    def totals_by_token(self) -> dict:
+        """{(chain, symbol): {"balance": Decimal, "usd": Decimal}} across all wallets."""
+        with self._lock:
+            return {key: {"balance": balance, "usd": usd} for key, (balance, usd) in self._totals.items()}
+
+    def totals_by_chain(self) -> dict:
+        """{chain: total USD value} across all wallets."""
+        by_chain = defaultdict(lambda: ZERO)
+        with self._lock:
+            for (chain, _), (_, usd) in self._totals.items():
+                by_chain[chain] += usd
+        return dict(by_chain)
+
+    def total_usd(self) -> Decimal:
+        with self._lock:
+            return sum((usd for _, usd in self._totals.values()), ZERO)
+
+    def print_summary(self) -> None:
+        print(f"\nTreasury: {len(self.snapshots)} wallets, ${self.total_usd():,.2f} total")
+        for chain, usd in sorted(self.totals_by_chain().items()):
+            print(f"  {chain}: ${usd:,.2f}")
+        for (chain, symbol), total in sorted(self.totals_by_token().items()):
+            print(f"    {chain} {symbol}: {total['balance']} (${total['usd']:,.2f})")
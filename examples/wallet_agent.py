@@ -11,18 +11,19 @@ Referral code STARTER is embedded — earn 10% of transaction fees.
 Sign up: https://purpleflea.com/referral?code=STARTER
 """
 
-import os
+from decimal import Decimal
+
 from dotenv import load_dotenv
-from purpleflea import WalletClient
+
+from clients import lazy_client
+from ledger import ledger
+from payouts import PayoutBatch
+from treasury import TreasuryView
 
 load_dotenv()
 
 # Initialize the client — referral code STARTER earns you 10% of fees
-client = WalletClient(
-    api_key=os.environ["PURPLEFLEA_API_KEY"],
-    referral_code=os.environ.get("PURPLEFLEA_REFERRAL_CODE", "STARTER"),
-    base_url=os.environ.get("PURPLEFLEA_WALLET_API", "https://wallet.purpleflea.com/api/v1"),
-)
+client = lazy_client("WalletClient", "wallet")
 
 
 def create_agent_wallet(agent_name: str, chains: list[str] = None) -> dict:
@@ -35,6 +36,7 @@ def create_agent_wallet(agent_name: str, chains: list[str] = None) -> dict:
         chains=chains,
         metadata={"agent": agent_name, "starter_kit": True}
     )
+    ledger.record("wallet", "create", subject=wallet.id, name=f"agent-{agent_name}", chains=chains)
     print(f"Created wallet for agent '{agent_name}':")
     for chain, address in wallet.addresses.items():
         print(f"  {chain}: {address}")
@@ -47,11 +49,24 @@ def check_balances(wallet_id: str) -> dict:
     print(f"\nBalances for wallet {wallet_id}:")
     for chain, tokens in balances.items():
         for token in tokens:
-            if float(token["balance"]) > 0:
+            if Decimal(str(token["balance"])) > 0:
                 print(f"  {chain} {token['symbol']}: {token['balance']} (${token['usd_value']:.2f})")
     return balances
 
 
+# Totals across many wallets, updated incrementally on each refresh
+treasury = TreasuryView(client)
+
+
+def check_treasury(wallet_ids: list[str]) -> dict:
+    """Fetch balances for many wallets concurrently and print totals by chain and token."""
+    summary = treasury.refresh(wallet_ids)
+    print(f"\nRefreshed {len(wallet_ids)} wallets: {summary['changed']} changed, "
+          f"{summary['unchanged']} unchanged, {len(summary['failed'])} failed")
+    treasury.print_summary()
+    return treasury.totals_by_token()
+
+
 def send_payment(wallet_id: str, to_address: str, amount: str, token: str = "USDC", chain: str = "base") -> dict:
     """Send a crypto payment autonomously."""
     tx = client.wallets.send(
@@ -61,6 +76,8 @@ def send_payment(wallet_id: str, to_address: str, amount: str, token: str = "USD
         token=token,
         chain=chain,
     )
+    ledger.record("wallet", "send", subject=wallet_id, amount=float(amount),
+                  token=token, chain=chain, to=to_address, hash=tx.hash)
     print(f"\nTransaction submitted:")
     print(f"  Hash: {tx.hash}")
     print(f"  Status: {tx.status}")
@@ -68,6 +85,21 @@ def send_payment(wallet_id: str, to_address: str, amount: str, token: str = "USD
     return tx
 
 
+def send_payouts(wallet_id: str, entries: list[tuple], batch_id: str, wait_seconds: float = 600) -> dict:
+    """
+    Pay many recipients at once. entries are (to, amount, token, chain) tuples.
+    Safe to re-run with the same batch_id: transfers already submitted are skipped.
+    """
+    batch = PayoutBatch(client, wallet_id, entries, batch_id)
+    batch.submit()
+    batch.track_confirmations()
+    counts = batch.wait(timeout=wait_seconds)
+    print(f"\nPayout batch {batch_id}: {len(entries)} transfers")
+    for status, count in sorted(counts.items()):
+        print(f"  {status}: {count}")
+    return counts
+
+
 def get_transaction_history(wallet_id: str, limit: int = 10) -> list:
     """Retrieve recent transaction history."""
     txns = client.wallets.list_transactions(wallet_id, limit=limit)
@@ -88,3 +120,5 @@ if __name__ == "__main__":
 
     # Example send (commented out to avoid accidental transactions)
     # tx = send_payment(wallet.id, "0xRecipientAddress", "1.00", "USDC", "base")
+    # send_payouts(wallet.id, [("0xRecipientA", "1.00", "USDC", "base"),
+    #                          ("RecipientSolAddress", "2.50", "USDC", "solana")], batch_id="rewards-001")